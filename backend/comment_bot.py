@@ -516,7 +516,7 @@ async def _click_reply_button_for_target(page: Page, target_comment_id: str) ->
     except Exception:
         discovered = []
 
-    selector_pool = discovered + fb_selectors.REPLY["reply_button"]
+    selector_pool = [*discovered, *fb_selectors.REPLY["reply_button"]]
     return await smart_click(page, selector_pool, "Reply button")
 
 
@@ -538,7 +538,7 @@ async def _attach_image_to_reply(page: Page, image_path: str) -> bool:
         except Exception:
             discovered_attach = []
 
-        attach_pool = discovered_attach + fb_selectors.REPLY["reply_attach_button"]
+        attach_pool = [*discovered_attach, *fb_selectors.REPLY["reply_attach_button"]]
 
         # First try native file-chooser flow from attach icon click.
         try:
@@ -1203,7 +1203,8 @@ async def click_with_healing(
         # 2. CSS failed - get diagnostics
         screenshot = await save_debug_screenshot(page, f"healing_{description.replace(' ', '_')}_{attempt}")
         audit = await audit_selectors(page, fb_selectors.COMMENT)
-        logger.info(f"Selector audit: {json.dumps(audit, indent=2)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Selector audit: %s", json.dumps(audit))
 
         # 3. Ask Gemini what to do (if vision available)
         if vision:
@@ -1236,7 +1237,7 @@ async def click_with_healing(
                 if new_selector:
                     logger.info(f"Trying Gemini-suggested selector: {new_selector}")
                     # Prepend to try first on next iteration
-                    selectors = [new_selector] + selectors
+                    selectors = [new_selector, *selectors]
 
             elif action == "SCROLL":
                 # Ignore scroll suggestions - we don't scroll on permalink pages
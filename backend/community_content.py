@@ -140,6 +140,7 @@ async def _generate_warmup_image(persona: Dict[str, Any], topic: str) -> Dict[st
                 reference_image_base64=reference_b64,
                 pose_prompt=pose_prompt,
                 profile_name=profile_name.replace(" ", "_").lower(),
+                return_base64=False,
             )
             if result.get("success") and result.get("image_path"):
                 return {"success": True, "image_path": result["image_path"]}
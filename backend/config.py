@@ -43,6 +43,10 @@ USA_TIMEZONES = [
     "America/Anchorage",
 ]
 
+# Relative weights for randomly assigned timezones, aligned with USA_TIMEZONES
+# (approximate share of US population per zone)
+USA_TIMEZONE_WEIGHTS = (0.46, 0.22, 0.06, 0.18, 0.03, 0.005)
+
 # =============================================================================
 # GEMINI VISION
 # =============================================================================
@@ -50,6 +54,12 @@ USA_TIMEZONES = [
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-3-flash-preview")
 CONFIDENCE_THRESHOLD = float(os.getenv("VISION_CONFIDENCE_THRESHOLD", "0.7"))
+# Max vision calls in flight at once (per-key rate limit)
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "5"))
+# Cap on tokens generated per vision call. Thinking counts toward it, so the
+# thinking budget is held well below it to leave room for the answer itself.
+VISION_MAX_OUTPUT_TOKENS = int(os.getenv("VISION_MAX_OUTPUT_TOKENS", "2048"))
+VISION_THINKING_BUDGET = int(os.getenv("VISION_THINKING_BUDGET", "512"))
 
 # =============================================================================
 # AI CAMPAIGN GENERATION
@@ -3,8 +3,32 @@ Mobile Facebook CSS Selectors
 Pre-mapped selectors for fast element detection on m.facebook.com
 """
 
+import sys
+from typing import Dict, List, Mapping, Tuple
+
+__all__ = [
+    "LOGIN",
+    "SIGNUP_PROMPT",
+    "TWO_FA",
+    "FEED",
+    "REELS",
+    "COMMENT",
+    "REPLY",
+    "NOTIFICATIONS",
+    "NAV",
+    "PAGE_STATE",
+    "get_selectors",
+    "get_selector_union",
+]
+
+
+def _freeze(selectors: Dict[str, List[str]]) -> Dict[str, Tuple[str, ...]]:
+    """Freeze selector lists into tuples of interned strings (immutable, shared)."""
+    return {key: tuple(sys.intern(s) for s in values) for key, values in selectors.items()}
+
+
 # Login Page Selectors
-LOGIN = {
+LOGIN = _freeze({
     # Input fields
     "email_input": [
         'input[name="email"]',
@@ -23,10 +47,10 @@ LOGIN = {
         'button:has-text("Log In")',
         'div[role="button"]:has-text("Log in")',
     ],
-}
+})
 
 # Signup/Welcome Page Selectors (when Facebook redirects away from login)
-SIGNUP_PROMPT = {
+SIGNUP_PROMPT = _freeze({
     "already_have_account": [
         'div[role="button"][aria-label="I already have an account"]',
         'div[role="button"]:has-text("already have an account")',
@@ -34,10 +58,10 @@ SIGNUP_PROMPT = {
         'a:has-text("already have an account")',
         'div:has-text("I already have an account"):visible',
     ],
-}
+})
 
 # 2FA Page Selectors
-TWO_FA = {
+TWO_FA = _freeze({
     # 2FA method selection (choosing authenticator app)
     "auth_app_option": [
         'div[role="button"]:has-text("Authenticator")',
@@ -83,10 +107,10 @@ TWO_FA = {
         'button:has-text("Remember")',
         'div[role="button"]:has-text("Save")',
     ],
-}
+})
 
 # Feed/Home Page Selectors
-FEED = {
+FEED = _freeze({
     "feed_container": [
         'div[role="feed"]',
         'div[data-pagelet="FeedUnit"]',
@@ -102,10 +126,10 @@ FEED = {
         'span:has-text("Like")',
         'div[role="button"]:has-text("Like")',
     ],
-}
+})
 
 # Reels Selectors
-REELS = {
+REELS = _freeze({
     "reels_tab": [
         'a[href*="/reel"]',
         'a[href*="reels"]',
@@ -120,10 +144,10 @@ REELS = {
         'div[aria-label="Next"]',
         'button[aria-label="Next"]',
     ],
-}
+})
 
 # Comment Selectors
-COMMENT = {
+COMMENT = _freeze({
     "comment_button": [
         # Icon-based selector - ONLY comment button starts with 󰍹 icon
         # Verified pattern: 󰍹comment, 󰍹 1comments, 󰍹 2comments
@@ -158,10 +182,10 @@ COMMENT = {
         '[data-sigil*="submit-comment"]',
         'button[type="submit"]',
     ],
-}
+})
 
 # Reply-to-comment selectors (reply_comment jobs)
-REPLY = {
+REPLY = _freeze({
     "reply_button": [
         'div[role="button"][aria-label*="Reply" i]',
         'button[aria-label*="Reply" i]',
@@ -196,10 +220,10 @@ REPLY = {
         'button[aria-label*="Post" i]',
         'button[aria-label*="Send" i]',
     ],
-}
+})
 
 # Notifications
-NOTIFICATIONS = {
+NOTIFICATIONS = _freeze({
     "bell_icon": [
         'a[href*="/notifications"]',
         'div[aria-label="Notifications"]',
@@ -209,10 +233,10 @@ NOTIFICATIONS = {
         'div[role="listitem"]',
         'a[href*="notif"]',
     ],
-}
+})
 
 # Navigation
-NAV = {
+NAV = _freeze({
     "home": [
         'a[href="/"]',
         'a[aria-label="Home"]',
@@ -221,10 +245,10 @@ NAV = {
         'div[aria-label="Menu"]',
         'a[href*="/menu"]',
     ],
-}
+})
 
 # State detection - to check what page we're on
-PAGE_STATE = {
+PAGE_STATE = _freeze({
     "logged_in_indicators": [
         'div[aria-label="Create a post"]',
         'a[href*="/notifications"]',
@@ -245,21 +269,53 @@ PAGE_STATE = {
         'text="secure your account"',
         'text="confirm your identity"',
     ],
+})
+
+
+# Category name -> selector table, built once at import
+_CATEGORIES: Dict[str, Mapping[str, Tuple[str, ...]]] = {
+    "login": LOGIN,
+    "signup_prompt": SIGNUP_PROMPT,
+    "two_fa": TWO_FA,
+    "feed": FEED,
+    "reels": REELS,
+    "comment": COMMENT,
+    "reply": REPLY,
+    "notifications": NOTIFICATIONS,
+    "nav": NAV,
+    "page_state": PAGE_STATE,
 }
 
 
-def get_selectors(category: str) -> dict:
+def get_selectors(category: str) -> Mapping[str, Tuple[str, ...]]:
     """Get selectors by category name"""
-    categories = {
-        "login": LOGIN,
-        "signup_prompt": SIGNUP_PROMPT,
-        "two_fa": TWO_FA,
-        "feed": FEED,
-        "reels": REELS,
-        "comment": COMMENT,
-        "reply": REPLY,
-        "notifications": NOTIFICATIONS,
-        "nav": NAV,
-        "page_state": PAGE_STATE,
-    }
-    return categories.get(category, {})
+    return _CATEGORIES.get(category, {})
+
+
+# Playwright-only selector syntax that cannot be folded into a plain CSS union
+_NON_CSS_MARKERS = (":has-text(", ":visible", "text=")
+
+# (category, key) -> (css_union, text_selectors), joined once per process
+_UNION_CACHE: Dict[Tuple[str, str], Tuple[str, Tuple[str, ...]]] = {}
+
+
+def get_selector_union(category: str, key: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Get one comma-joined CSS union for a selector list, plus the leftover
+    Playwright text selectors that must still be tried one by one.
+
+    Use when any match is good enough: one locator(css_union) call replaces
+    N per-selector lookups. Keep iterating the raw list when order matters.
+    """
+    cache_key = (category, key)
+    cached = _UNION_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    selectors = get_selectors(category).get(key, [])
+    css = [s for s in selectors if not any(m in s for m in _NON_CSS_MARKERS)]
+    text = tuple(s for s in selectors if any(m in s for m in _NON_CSS_MARKERS))
+    result = (", ".join(css), text)
+    _UNION_CACHE[cache_key] = result
+    return result
+
@@ -11,17 +11,123 @@ import logging
 import os
 import random
 import shutil
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 logger = logging.getLogger("FBSession")
 
-from config import USA_TIMEZONES
+from config import USA_TIMEZONES, USA_TIMEZONE_WEIGHTS
+
+# Session files are written compact; set FB_SESSION_PRETTY=1 for indented, diff-friendly output
+_PRETTY = bool(os.getenv("FB_SESSION_PRETTY"))
+
+# orjson parses bytes directly in C (optional - falls back to stdlib json)
+try:
+    import orjson
+
+    def _loads(raw: bytes) -> Any:
+        return orjson.loads(raw)
+
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if _PRETTY else 0)
+except ImportError:
+    def _loads(raw: bytes) -> Any:
+        return json.loads(raw)
+
+    def _dumps(data: Any) -> bytes:
+        if _PRETTY:
+            return json.dumps(data, indent=2).encode("utf-8")
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+# msgspec decodes the listing fields straight into typed structs (optional).
+# Unknown keys (storage state, device, viewport...) are skipped without
+# building dicts, and cookies decode to two-field structs.
+try:
+    import msgspec
+
+    class _CookieSummary(msgspec.Struct):
+        name: Any = None
+        value: Any = None
+
+    class _SessionSummary(msgspec.Struct):
+        profile_name: Any = None
+        display_name: Any = None
+        extracted_at: Any = None
+        proxy: Any = None
+        profile_picture: Any = None
+        tags: Any = msgspec.field(default_factory=list)
+        cookies: List[_CookieSummary] = msgspec.field(default_factory=list)
+        user_id: Any = msgspec.field(default=None, name="_user_id")
+        has_valid_cookies: Any = msgspec.field(default=None, name="_has_valid_cookies")
+
+    _summary_decoder = msgspec.json.Decoder(_SessionSummary)
+except ImportError:
+    _summary_decoder = None
 
 SESSIONS_DIR = Path(os.getenv("SESSIONS_DIR", str(Path(__file__).parent / "sessions")))
 SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Characters replaced in session filenames. Extending this renames existing
+# session files, so keep it in sync with what is already on disk.
+_SANITIZE_TABLE = str.maketrans({" ": "_", "/": "_"})
+
+# BrowserContext -> navigator.userAgent; the UA is fixed for a context's lifetime
+_UA_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# Upper bound on threads used to read session files in list_saved_sessions
+_LIST_MAX_WORKERS = 32
+
+# (cache_key, sessions) from the last list_saved_sessions scan; reset by FacebookSession.save
+_LIST_CACHE: Optional[Tuple[Tuple, List[Dict[str, Any]]]] = None
+
+
+# Dedicated RNG so fingerprint draws don't contend on the shared module-level random state
+_TZ_RNG = random.Random()
+
+
+def random_usa_timezone() -> str:
+    """Pick a USA timezone weighted by population (for sessions without a user ID)."""
+    return _TZ_RNG.choices(USA_TIMEZONES, weights=USA_TIMEZONE_WEIGHTS, k=1)[0]
+
+
+def timezone_for_user_id(user_id: str) -> str:
+    """
+    Deterministically map a Facebook user ID to a USA timezone.
+
+    Uses md5 rather than hash() so the mapping survives PYTHONHASHSEED
+    randomization across restarts. Do not swap the digest: existing accounts
+    would silently move to a different timezone.
+    """
+    digest = hashlib.md5(user_id.encode("utf-8")).digest()
+    return USA_TIMEZONES[int.from_bytes(digest, "big") % len(USA_TIMEZONES)]
+
+
+async def _get_user_agent(page) -> str:
+    """Read navigator.userAgent once per browser context and reuse it."""
+    context = page.context
+    try:
+        cached = _UA_CACHE.get(context)
+    except TypeError:
+        # Context type not weak-referenceable - evaluate every time
+        return await page.evaluate("navigator.userAgent")
+    if cached is None:
+        cached = await page.evaluate("navigator.userAgent")
+        _UA_CACHE[context] = cached
+    return cached
+
+
+def _index_cookies(cookies: List[Dict]) -> Dict[str, Dict]:
+    """Build a {name: cookie} index; the first occurrence wins on duplicate names, like a linear scan."""
+    index: Dict[str, Dict] = {}
+    for c in cookies:
+        index.setdefault(c.get("name"), c)
+    return index
+
 
 class FacebookSession:
     """Manages Facebook session persistence for a single account."""
@@ -30,10 +136,29 @@ class FacebookSession:
         self.profile_name = profile_name
         self.session_file = SESSIONS_DIR / f"{self._sanitize_name(profile_name)}.json"
         self.data: Optional[Dict[str, Any]] = None
+        self._cookie_index: Optional[Dict[str, Dict]] = None
+        self._cookie_index_source: Optional[List[Dict]] = None
+
+    def _index(self) -> Dict[str, Dict]:
+        """
+        Get a {name: cookie} index of the session cookies, built lazily.
+
+        Rebuilt whenever the cookie list object changes (e.g. callers assigning
+        self.data directly), and explicitly invalidated on load/save/extract.
+        """
+        cookies = self.data.get("cookies", []) if self.data else []
+        if self._cookie_index is None or self._cookie_index_source is not cookies:
+            self._cookie_index = _index_cookies(cookies)
+            self._cookie_index_source = cookies
+        return self._cookie_index
+
+    def _invalidate_index(self):
+        self._cookie_index = None
+        self._cookie_index_source = None
 
     def _sanitize_name(self, name: str) -> str:
         """Convert profile name to safe filename."""
-        return name.replace(" ", "_").replace("/", "_").lower()
+        return name.translate(_SANITIZE_TABLE).lower()
 
     async def extract_from_page(self, page, adspower_id: str = None, proxy: str = None) -> Dict[str, Any]:
         """
@@ -53,9 +178,9 @@ class FacebookSession:
         cookies = await context.cookies()
 
         # Extract user agent
-        user_agent = await page.evaluate("navigator.userAgent")
+        user_agent = await _get_user_agent(page)
 
-        # Get viewport
+        # Get viewport (local property, no browser round-trip)
         viewport = page.viewport_size or {"width": 393, "height": 873}
 
         # Build session data
@@ -68,17 +193,17 @@ class FacebookSession:
             "viewport": viewport,
             "proxy": proxy,
         }
+        self._invalidate_index()
 
-        # Check for essential Facebook cookies
-        cookie_names = [c.get("name") for c in cookies]
-        has_c_user = "c_user" in cookie_names
-        has_xs = "xs" in cookie_names
+        # Check for essential Facebook cookies (one pass builds the index reused below)
+        index = self._index()
+        has_c_user = "c_user" in index
+        has_xs = "xs" in index
 
         if not has_c_user or not has_xs:
             logger.warning(f"Missing essential cookies! c_user: {has_c_user}, xs: {has_xs}")
         else:
-            c_user = next((c for c in cookies if c.get("name") == "c_user"), None)
-            logger.info(f"Session extracted for user {c_user.get('value') if c_user else 'unknown'}")
+            logger.info(f"Session extracted for user {index['c_user'].get('value') or 'unknown'}")
 
         return self.data
 
@@ -96,16 +221,23 @@ class FacebookSession:
             if self.session_file.exists():
                 shutil.copy2(self.session_file, backup_file)
 
-            # 2. Write to temp file first
-            temp_file.write_text(json.dumps(self.data, indent=2))
+            # 2. Persist derived cookie facts so list_saved_sessions can skip the cookie scan
+            self.data["_user_id"] = self.get_user_id()
+            self.data["_has_valid_cookies"] = self.has_valid_cookies()
+
+            # 3. Write to temp file first
+            temp_file.write_bytes(_dumps(self.data))
 
-            # 3. Atomic rename (atomic on unix filesystems)
-            temp_file.rename(self.session_file)
+            # 4. Atomic replace (also overwrites an existing target on Windows)
+            os.replace(temp_file, self.session_file)
+            self._invalidate_index()
+            _invalidate_list_cache()
 
             logger.info(f"Session saved to {self.session_file}")
             return True
         except Exception as e:
             logger.error(f"Failed to save session: {e}")
+            temp_file.unlink(missing_ok=True)
             # Try to restore from backup if save failed
             if backup_file.exists() and not self.session_file.exists():
                 try:
@@ -122,7 +254,8 @@ class FacebookSession:
             return None
 
         try:
-            self.data = json.loads(self.session_file.read_text())
+            self.data = _loads(self.session_file.read_bytes())
+            self._invalidate_index()
             logger.info(f"Session loaded from {self.session_file}")
             return self.data
         except Exception as e:
@@ -157,18 +290,14 @@ class FacebookSession:
         """Check if session has the essential Facebook cookies."""
         if not self.data:
             return False
-        cookies = self.data.get("cookies", [])
-        cookie_names = [c.get("name") for c in cookies]
-        return "c_user" in cookie_names and "xs" in cookie_names
+        index = self._index()
+        return "c_user" in index and "xs" in index
 
     def get_user_id(self) -> Optional[str]:
         """Get Facebook user ID from c_user cookie."""
         if not self.data:
             return None
-        for cookie in self.data.get("cookies", []):
-            if cookie.get("name") == "c_user":
-                return cookie.get("value")
-        return None
+        return self._index().get("c_user", {}).get("value")
 
     def import_from_cookies(
         self,
@@ -194,12 +323,12 @@ class FacebookSession:
             Dict containing all session data
         """
         # Validate essential cookies
-        cookie_names = [c.get("name") for c in cookies]
-        if "c_user" not in cookie_names or "xs" not in cookie_names:
+        cookie_index = _index_cookies(cookies)
+        if "c_user" not in cookie_index or "xs" not in cookie_index:
             raise ValueError("Missing essential cookies: c_user and xs are required")
 
         # Extract user ID from c_user cookie
-        user_id = next((c.get("value") for c in cookies if c.get("name") == "c_user"), None)
+        user_id = cookie_index["c_user"].get("value")
 
         # Build session data
         self.data = {
@@ -212,6 +341,7 @@ class FacebookSession:
             "proxy": proxy,
             "tags": tags or ["imported"],
         }
+        self._invalidate_index()
 
         # Add profile picture if provided
         if profile_picture:
@@ -228,7 +358,7 @@ class FacebookSession:
         if not self.data:
             # Generate random fingerprint for new sessions
             return {
-                "timezone": random.choice(USA_TIMEZONES),
+                "timezone": random_usa_timezone(),
                 "locale": "en-US"
             }
 
@@ -244,16 +374,14 @@ class FacebookSession:
         # Generate consistent fingerprint based on user ID (so same session = same timezone)
         user_id = self.get_user_id()
         if user_id:
-            # Use user ID hash to deterministically select timezone
-            timezone_index = int(hashlib.md5(user_id.encode()).hexdigest(), 16) % len(USA_TIMEZONES)
             return {
-                "timezone": USA_TIMEZONES[timezone_index],
+                "timezone": timezone_for_user_id(user_id),
                 "locale": "en-US"
             }
 
         # Fallback to random
         return {
-            "timezone": random.choice(USA_TIMEZONES),
+            "timezone": random_usa_timezone(),
             "locale": "en-US"
         }
 
@@ -283,13 +411,23 @@ async def apply_session_to_context(context, session: FacebookSession) -> bool:
         return False
 
 
-async def verify_session_logged_in(page, debug: bool = True) -> bool:
+def _me_redirect_resolved(url: str) -> bool:
+    """True once /me/ has redirected to a profile, login, checkpoint or home page."""
+    url = url.lower()
+    if any(marker in url for marker in ("/login", "checkpoint", "/profile", "/home.php")):
+        return True
+    return not url.split("?", 1)[0].rstrip("/").endswith("/me")
+
+
+async def verify_session_logged_in(page, session: Optional[FacebookSession] = None, debug: bool = True) -> bool:
     """
     Verify if the current page/session is logged into Facebook.
     Uses /me/ navigation which is reliable on both mobile and desktop.
 
     Args:
         page: Playwright page object
+        session: FacebookSession whose cookies were applied to this context (optional).
+            When it has a c_user cookie, the context.cookies() round-trip is skipped.
         debug: If True, log extra debugging info
 
     Returns:
@@ -297,14 +435,15 @@ async def verify_session_logged_in(page, debug: bool = True) -> bool:
     """
     try:
         # 1. Check cookies first (fastest check)
-        cookies = await page.context.cookies()
-        cookie_names = [c.get("name") for c in cookies]
+        c_user_value = session.get_user_id() if session else None
+        if not c_user_value:
+            cookies = await page.context.cookies()
+            c_user_value = next((c.get("value") for c in cookies if c.get("name") == "c_user"), None)
 
-        if "c_user" not in cookie_names:
+        if not c_user_value:
             logger.info("No c_user cookie - not logged in")
             return False
 
-        c_user_value = next((c.get("value") for c in cookies if c.get("name") == "c_user"), None)
         if debug:
             logger.info(f"Found c_user cookie: {c_user_value}")
 
@@ -313,7 +452,12 @@ async def verify_session_logged_in(page, debug: bool = True) -> bool:
         # If logged out: redirects to /login
         logger.info("Navigating to /me/ to verify session...")
         await page.goto("https://m.facebook.com/me/", wait_until="domcontentloaded", timeout=30000)
-        await page.wait_for_timeout(2000)
+        try:
+            # Return as soon as the /me/ redirect settles instead of a fixed 2s sleep
+            await page.wait_for_url(_me_redirect_resolved, timeout=3000)
+        except PlaywrightTimeoutError:
+            # Timeout just means no further redirect - inspect the URL we have
+            pass
 
         current_url = page.url.lower()
         if debug:
@@ -343,37 +487,120 @@ async def verify_session_logged_in(page, debug: bool = True) -> bool:
         return False
 
 
+def _session_info(session_file: Path, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the list_saved_sessions entry from a fully parsed session dict."""
+    if "_has_valid_cookies" in data:
+        # Precomputed by FacebookSession.save
+        user_id = data.get("_user_id")
+        has_valid_cookies = bool(data["_has_valid_cookies"])
+    else:
+        # Legacy file: one pass over the cookies serves both values
+        cookie_index = _index_cookies(data.get("cookies", []))
+        user_id = cookie_index.get("c_user", {}).get("value")
+        has_valid_cookies = "c_user" in cookie_index and "xs" in cookie_index
+    return {
+        "file": session_file.name,
+        "profile_name": data.get("profile_name"),
+        "display_name": data.get("display_name") or data.get("profile_name"),  # Pretty name for UI
+        "user_id": user_id,
+        "extracted_at": data.get("extracted_at"),
+        "proxy": data.get("proxy"),
+        "has_valid_cookies": has_valid_cookies,
+        "profile_picture": data.get("profile_picture"),  # Base64 PNG or None
+        "tags": data.get("tags", []),  # Session tags for filtering
+    }
+
+
+def _summary_info(session_file: Path, summary: "_SessionSummary") -> Dict[str, Any]:
+    """Build the list_saved_sessions entry from a msgspec-decoded summary."""
+    if summary.has_valid_cookies is not None:
+        user_id = summary.user_id
+        has_valid_cookies = bool(summary.has_valid_cookies)
+    else:
+        user_id = next((c.value for c in summary.cookies if c.name == "c_user"), None)
+        names = {c.name for c in summary.cookies}
+        has_valid_cookies = "c_user" in names and "xs" in names
+    return {
+        "file": session_file.name,
+        "profile_name": summary.profile_name,
+        "display_name": summary.display_name or summary.profile_name,
+        "user_id": user_id,
+        "extracted_at": summary.extracted_at,
+        "proxy": summary.proxy,
+        "has_valid_cookies": has_valid_cookies,
+        "profile_picture": summary.profile_picture,
+        "tags": summary.tags,
+    }
+
+
+def _load_session_info(session_file: Path) -> Optional[Dict[str, Any]]:
+    """Read one session file into the summary dict used by list_saved_sessions."""
+    try:
+        raw = session_file.read_bytes()
+        if _summary_decoder is not None:
+            try:
+                return _summary_info(session_file, _summary_decoder.decode(raw))
+            except msgspec.ValidationError:
+                # Unexpected shape (e.g. cookies not a list of objects) - use the generic parser
+                pass
+        return _session_info(session_file, _loads(raw))
+    except Exception as e:
+        logger.error(f"Failed to read {session_file}: {e}")
+        return None
+
+
+def _invalidate_list_cache():
+    global _LIST_CACHE
+    _LIST_CACHE = None
+
+
+def _scan_session_entries() -> List[os.DirEntry]:
+    """Session *.json entries sorted by name; DirEntry caches stat() for the cache key."""
+    with os.scandir(SESSIONS_DIR) as it:
+        entries = [e for e in it if e.name.endswith(".json") and e.is_file()]
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+
+def _list_cache_key(entries: List[os.DirEntry]) -> Tuple:
+    """Directory path + mtime plus the newest file mtime (catches in-place rewrites)."""
+    newest = max((e.stat().st_mtime_ns for e in entries), default=0)
+    return (str(SESSIONS_DIR), SESSIONS_DIR.stat().st_mtime_ns, len(entries), newest)
+
+
 def list_saved_sessions() -> List[Dict[str, Any]]:
     """
     List all saved session files with basic info.
+    Files are read on a thread pool since the listing is I/O bound, and the
+    result is reused until the sessions directory changes.
 
     Returns:
-        List of dicts with session info
+        List of dicts with session info, sorted by file name
     """
-    sessions = []
-    for session_file in sorted(SESSIONS_DIR.glob("*.json")):
-        try:
-            data = json.loads(session_file.read_text())
-            cookie_names = [c.get("name") for c in data.get("cookies", [])]
-            sessions.append({
-                "file": session_file.name,
-                "profile_name": data.get("profile_name"),
-                "display_name": data.get("display_name") or data.get("profile_name"),  # Pretty name for UI
-                "user_id": None,  # Will extract below
-                "extracted_at": data.get("extracted_at"),
-                "proxy": data.get("proxy"),
-                "has_valid_cookies": ("c_user" in cookie_names and "xs" in cookie_names),
-                "profile_picture": data.get("profile_picture"),  # Base64 PNG or None
-                "tags": data.get("tags", []),  # Session tags for filtering
-            })
-            # Extract user ID
-            for cookie in data.get("cookies", []):
-                if cookie.get("name") == "c_user":
-                    sessions[-1]["user_id"] = cookie.get("value")
-                    break
-        except Exception as e:
-            logger.error(f"Failed to read {session_file}: {e}")
-    return sessions
+    global _LIST_CACHE
+    entries = _scan_session_entries()
+    try:
+        cache_key = _list_cache_key(entries)
+    except OSError:
+        # A file vanished between scandir and stat - skip the cache this round
+        cache_key = None
+
+    if cache_key is not None and _LIST_CACHE is not None and _LIST_CACHE[0] == cache_key:
+        sessions = _LIST_CACHE[1]
+    else:
+        sessions = []
+        session_files = [Path(e.path) for e in entries]
+        if session_files:
+            with ThreadPoolExecutor(max_workers=min(_LIST_MAX_WORKERS, len(session_files))) as executor:
+                # executor.map preserves input order
+                sessions = [info for info in executor.map(_load_session_info, session_files) if info is not None]
+        _LIST_CACHE = (cache_key, sessions) if cache_key is not None else None
+
+    # Copies (including the tags list) so callers can annotate entries without touching the cache
+    return [
+        {**info, "tags": list(info["tags"])} if isinstance(info.get("tags"), list) else dict(info)
+        for info in sessions
+    ]
 
 
 def update_session_tags(profile_name: str, tags: List[str]) -> bool:
@@ -6,32 +6,65 @@ Optimized for realistic, candid iPhone-style selfies.
 """
 
 import asyncio
-import base64
+import hashlib
 import io
 import logging
 import os
 import random
-import uuid
-from datetime import datetime
+import re
+import time
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple, Union
+
+# pybase64 is a drop-in with SIMD codecs (optional - falls back to stdlib base64)
+try:
+    import pybase64 as base64
+
+    _b64encode_str = base64.b64encode_as_string
+except ImportError:
+    import base64
+
+    def _b64encode_str(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
 
 from PIL import Image
 from google import genai
 from google.genai import types
 
+from gemini_retry import call_with_retry
+
 logger = logging.getLogger(__name__)
 
 # Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 IMAGE_MODEL = "gemini-3-pro-image-preview"  # Gemini 3 image generation model
 
+# Upper bound on concurrent image generations (per-key rate limit). Every
+# generate_content call goes through the module-wide gate; batches default to it.
+IMAGE_GEN_MAX_CONCURRENCY = int(os.getenv("IMAGE_GEN_MAX_CONCURRENCY", "4"))
+_generation_semaphore = asyncio.Semaphore(IMAGE_GEN_MAX_CONCURRENCY)
+
+# Per-attempt deadline; image generation runs well past the vision default
+IMAGE_GEN_TIMEOUT = float(os.getenv("IMAGE_GEN_TIMEOUT", "180"))
+
+# Longest side of the reference photo sent with pose regenerations
+REFERENCE_MAX_SIDE = 1024
+
+# Opt-in lossy formats for saved photos: format -> (PIL format, save options)
+_SAVE_FORMATS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "webp": ("WEBP", {"quality": 90, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 90}),
+}
+
 # Output directory for generated images
 IMAGE_OUTPUT_DIR = Path(os.getenv("IMAGE_OUTPUT_DIR", "/tmp/profile_photos"))
 IMAGE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Pose variations for profile photo regeneration - simple natural language phrases
-POSE_VARIATIONS: List[Dict[str, str]] = [
+# Pose variations for profile photo regeneration - simple natural language phrases.
+# Read-only views: get_pose_by_name hands out the shared entries.
+POSE_VARIATIONS: Tuple[Mapping[str, str], ...] = tuple(MappingProxyType(p) for p in (
     {"name": "beach", "prompt": "at the beach with ocean in background, sunny day"},
     {"name": "gym_mirror", "prompt": "gym mirror selfie in workout clothes"},
     {"name": "coffee_shop", "prompt": "in a cozy coffee shop holding a latte"},
@@ -44,29 +77,71 @@ POSE_VARIATIONS: List[Dict[str, str]] = [
     {"name": "bathroom_mirror", "prompt": "bathroom mirror selfie getting ready"},
     {"name": "hiking", "prompt": "hiking outdoors with nature in background"},
     {"name": "pool", "prompt": "by the pool on a sunny day"},
-]
+))
+_POSE_BY_NAME: Dict[str, Mapping[str, str]] = {p["name"]: p for p in POSE_VARIATIONS}
+
+# Persona keywords, checked in order (first matching bucket wins). Matching is
+# on whole words, so "caucasian" no longer needs to be ordered ahead of "asian";
+# plural and inflected forms are listed explicitly ("guys", "younger", ...).
+_PERSONA_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MIDDLE_AGED_RE = re.compile(r"\bmiddle[- ]aged\b")
+
+_GENDER_KEYWORDS = (
+    ("woman", frozenset({"woman", "women", "female", "females", "lady", "ladies", "girl", "girls", "she"})),
+    ("man", frozenset({"man", "men", "male", "males", "guy", "guys", "he"})),
+)
+_AGE_KEYWORDS = (
+    ("25-32", frozenset({"young", "younger", "youthful", "20s", "twenties"})),
+    ("40-50", frozenset({"middle-aged", "40s", "forties"})),
+    ("55-65", frozenset({"older", "elderly", "senior", "seniors", "50s", "60s", "fifties", "sixties"})),
+)
+_ETHNICITY_KEYWORDS = (
+    ("caucasian", frozenset({"white", "caucasian", "caucasians"})),
+    ("african american", frozenset({"black", "african", "africans"})),
+    ("asian", frozenset({"asian", "asians", "chinese", "japanese", "korean", "koreans"})),
+    ("latina", frozenset({"latina", "latinas", "latino", "latinos", "hispanic", "hispanics", "mexican", "mexicans"})),
+    ("south asian", frozenset({"indian", "indians"})),
+)
+
+
+def _match_keywords(tokens: set, table, default: str) -> str:
+    for value, words in table:
+        if not words.isdisjoint(tokens):
+            return value
+    return default
+
+
+@lru_cache(maxsize=512)
+def parse_persona_description(persona_description: str) -> Tuple[str, str, str]:
+    """Parse a persona description into (gender, age_range, ethnicity)."""
+    desc_lower = persona_description.lower()
+    tokens = set(_PERSONA_TOKEN_RE.findall(desc_lower))
+    if _MIDDLE_AGED_RE.search(desc_lower):
+        tokens.add("middle-aged")
+
+    return (
+        _match_keywords(tokens, _GENDER_KEYWORDS, "woman"),
+        _match_keywords(tokens, _AGE_KEYWORDS, "30-40"),
+        _match_keywords(tokens, _ETHNICITY_KEYWORDS, "caucasian"),
+    )
+
+
+# Singleton client, so generations reuse its HTTP connection pool
+_image_client: Optional[genai.Client] = None
 
 
 def get_image_client():
-    """Get Gemini client configured for image generation."""
+    """Get (or create) the Gemini client configured for image generation."""
+    global _image_client
     if not GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY environment variable not set")
-    return genai.Client(api_key=GEMINI_API_KEY)
+    if _image_client is None:
+        _image_client = genai.Client(api_key=GEMINI_API_KEY)
+    return _image_client
 
 
-def build_selfie_prompt(
-    gender: str = "woman",
-    age_range: str = "30-40",
-    ethnicity: str = "caucasian",
-    extra_details: str = ""
-) -> str:
-    """
-    Build a highly specific prompt for realistic iPhone selfie generation.
-
-    The goal is a photo that looks like a real person took it with their phone -
-    not a professional photo, not AI-generated looking.
-    """
-    prompt = f"""Generate a hyper-realistic iPhone selfie photo of a {ethnicity} {gender} in their {age_range}s.
+# Invariant body of the selfie prompt, built once rather than re-formatted per call
+_SELFIE_PROMPT_REQUIREMENTS = """
 
 CRITICAL REQUIREMENTS FOR REALISM:
 - Shot on iPhone 15 Pro, front camera
@@ -93,9 +168,86 @@ ANTI-AI TELLS TO AVOID:
 ASPECT RATIO: 1:1 square (for profile picture use)
 STYLE: Raw, unedited, authentic social media selfie. Just the photo, nothing else.
 
-{extra_details}"""
+"""
 
-    return prompt
+
+@lru_cache(maxsize=256)
+def build_selfie_prompt(
+    gender: str = "woman",
+    age_range: str = "30-40",
+    ethnicity: str = "caucasian",
+    extra_details: str = ""
+) -> str:
+    """
+    Build a highly specific prompt for realistic iPhone selfie generation.
+
+    The goal is a photo that looks like a real person took it with their phone -
+    not a professional photo, not AI-generated looking.
+    """
+    return (
+        f"Generate a hyper-realistic iPhone selfie photo of a {ethnicity} {gender} in their {age_range}s."
+        + _SELFIE_PROMPT_REQUIREMENTS
+        + extra_details
+    )
+
+
+def _cache_path(key_material: bytes, save_format: str) -> Path:
+    """Content-addressed location for an opt-in cached photo."""
+    key = hashlib.blake2b(key_material, digest_size=16).hexdigest()
+    return IMAGE_OUTPUT_DIR / f"cache_{key}.{save_format}"
+
+
+def _copy_from_cache(cache_path: Path, image_path: Path) -> Optional[bytes]:
+    """
+    Copy a cached photo to a fresh output path, returning its bytes (None on a miss).
+
+    Callers get their own file because workflows delete the photo after upload.
+    """
+    try:
+        image_data = cache_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    image_path.write_bytes(image_data)
+    return image_data
+
+
+def _store_in_cache(cache_path: Path, image_data: bytes):
+    """Atomically write a generated photo to the cache."""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.urandom(4).hex()}.tmp")
+    try:
+        tmp_path.write_bytes(image_data)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"[IMAGE_GEN] Could not cache photo: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def _check_save_format(save_format: str):
+    """Reject unknown formats before paying for a generation that couldn't be saved."""
+    if save_format != "png" and save_format not in _SAVE_FORMATS:
+        allowed = ", ".join(["png", *_SAVE_FORMATS])
+        raise ValueError(f"Unsupported save_format {save_format!r}; expected one of: {allowed}")
+
+
+def _save_image(image_path: Path, image_data, save_format: str = "png") -> bytes:
+    """
+    Write a response image to disk, decoding it first if it came back as base64.
+
+    PNG is written byte-for-byte; "webp" or "jpeg" re-encodes once for a much
+    smaller file. Returns the bytes written.
+    """
+    if isinstance(image_data, str):
+        image_data = base64.b64decode(image_data)
+    if save_format != "png":
+        image = Image.open(io.BytesIO(image_data))
+        if save_format == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+        buf = io.BytesIO()
+        pil_format, options = _SAVE_FORMATS[save_format]
+        image.save(buf, format=pil_format, **options)
+        image_data = buf.getvalue()
+    image_path.write_bytes(image_data)
+    return image_data
 
 
 async def generate_profile_photo(
@@ -103,7 +255,9 @@ async def generate_profile_photo(
     age_range: str = "30-40",
     ethnicity: str = "caucasian",
     extra_details: str = "",
-    profile_name: Optional[str] = None
+    profile_name: Optional[str] = None,
+    save_format: str = "png",
+    reuse_cached: bool = False
 ) -> Dict[str, Any]:
     """
     Generate a realistic AI profile photo.
@@ -114,28 +268,57 @@ async def generate_profile_photo(
         ethnicity: e.g., "caucasian", "african american", "asian", "latina"
         extra_details: Additional prompt details (hair color, style, etc.)
         profile_name: Optional profile name for filename
+        save_format: "png" (default, as returned), "webp" or "jpeg"
+        reuse_cached: Reuse an earlier photo generated from the same attributes
+            instead of calling Gemini (off by default: each call yields a new face)
 
     Returns:
         Dict with:
             - success: bool
             - image_path: str (path to saved image)
+            - cached: bool (True if served from the cache)
             - error: str (if failed)
+
+    Raises:
+        ValueError: If save_format is not supported
     """
+    _check_save_format(save_format)
     try:
-        client = get_image_client()
         prompt = build_selfie_prompt(gender, age_range, ethnicity, extra_details)
 
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename_base = profile_name or f"profile_{os.urandom(4).hex()}"
+        filename = f"{filename_base}_{timestamp}.{save_format}"
+        image_path = IMAGE_OUTPUT_DIR / filename
+
+        cache_path = _cache_path(prompt.encode("utf-8"), save_format) if reuse_cached else None
+        if cache_path is not None and await asyncio.to_thread(_copy_from_cache, cache_path, image_path):
+            logger.info(f"[IMAGE_GEN] Reused cached profile photo: {image_path}")
+            return {
+                "success": True,
+                "image_path": str(image_path),
+                "filename": filename,
+                "prompt_used": prompt[:200] + "...",
+                "cached": True
+            }
+
+        client = get_image_client()
+
         logger.info(f"[IMAGE_GEN] Generating profile photo: {gender}, {age_range}, {ethnicity}")
-        logger.debug(f"[IMAGE_GEN] Full prompt: {prompt}")
+        logger.debug("[IMAGE_GEN] Full prompt: %s", prompt)
 
         # Generate image
-        response = await asyncio.to_thread(
-            client.models.generate_content,
-            model=IMAGE_MODEL,
-            contents=[prompt],
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-            )
+        response = await call_with_retry(
+            partial(
+                client.aio.models.generate_content,
+                model=IMAGE_MODEL,
+                contents=[prompt],
+                config=types.GenerateContentConfig(
+                    response_modalities=["IMAGE"],
+                )
+            ),
+            _generation_semaphore,
+            timeout=IMAGE_GEN_TIMEOUT,
         )
 
         # Extract image from response
@@ -152,20 +335,10 @@ async def generate_profile_photo(
                 "error": "No image generated in response"
             }
 
-        # Save image
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_base = profile_name or f"profile_{uuid.uuid4().hex[:8]}"
-        filename = f"{filename_base}_{timestamp}.png"
-        image_path = IMAGE_OUTPUT_DIR / filename
-
-        # Decode and save
-        if isinstance(image_data, str):
-            image_bytes = base64.b64decode(image_data)
-        else:
-            image_bytes = image_data
-
-        with open(image_path, "wb") as f:
-            f.write(image_bytes)
+        # Decode and save off the event loop
+        saved_bytes = await asyncio.to_thread(_save_image, image_path, image_data, save_format)
+        if cache_path is not None:
+            await asyncio.to_thread(_store_in_cache, cache_path, saved_bytes)
 
         logger.info(f"[IMAGE_GEN] Saved profile photo: {image_path}")
 
@@ -173,7 +346,8 @@ async def generate_profile_photo(
             "success": True,
             "image_path": str(image_path),
             "filename": filename,
-            "prompt_used": prompt[:200] + "..."  # Truncate for logging
+            "prompt_used": prompt[:200] + "...",  # Truncate for logging
+            "cached": False
         }
 
     except Exception as e:
@@ -184,6 +358,29 @@ async def generate_profile_photo(
         }
 
 
+async def generate_profile_photos_batch(
+    specs: List[Dict[str, Any]],
+    max_concurrency: int = IMAGE_GEN_MAX_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Generate several profile photos concurrently.
+
+    Args:
+        specs: Keyword arguments for generate_profile_photo, one dict per photo
+        max_concurrency: Maximum generations in flight at once
+
+    Returns:
+        Result dicts from generate_profile_photo, in the same order as specs
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _generate(spec: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await generate_profile_photo(**spec)
+
+    return await asyncio.gather(*(_generate(spec) for spec in specs))
+
+
 async def generate_profile_photo_for_persona(persona_description: str, profile_name: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate a profile photo based on a natural language persona description.
@@ -195,40 +392,8 @@ async def generate_profile_photo_for_persona(persona_description: str, profile_n
     Returns:
         Dict with success status and image path
     """
-    # Parse persona into structured attributes
-    desc_lower = persona_description.lower()
-
-    # Detect gender
-    if any(w in desc_lower for w in ["woman", "female", "lady", "girl", "she"]):
-        gender = "woman"
-    elif any(w in desc_lower for w in ["man", "male", "guy", "he"]):
-        gender = "man"
-    else:
-        gender = "woman"  # Default
-
-    # Detect age range
-    if any(w in desc_lower for w in ["young", "20s", "twenties"]):
-        age_range = "25-32"
-    elif any(w in desc_lower for w in ["middle-aged", "middle aged", "40s", "forties"]):
-        age_range = "40-50"
-    elif any(w in desc_lower for w in ["older", "senior", "50s", "60s"]):
-        age_range = "55-65"
-    else:
-        age_range = "30-40"  # Default
-
-    # Detect ethnicity (check caucasian/white FIRST — "caucasian" contains "asian" as substring)
-    if any(w in desc_lower for w in ["white", "caucasian"]):
-        ethnicity = "caucasian"
-    elif any(w in desc_lower for w in ["black", "african"]):
-        ethnicity = "african american"
-    elif any(w in desc_lower for w in ["asian", "chinese", "japanese", "korean"]):
-        ethnicity = "asian"
-    elif any(w in desc_lower for w in ["latina", "hispanic", "mexican"]):
-        ethnicity = "latina"
-    elif any(w in desc_lower for w in ["indian", "south asian"]):
-        ethnicity = "south asian"
-    else:
-        ethnicity = "caucasian"  # Default
+    # Parse persona into structured attributes (defaults: woman, 30-40, caucasian)
+    gender, age_range, ethnicity = parse_persona_description(persona_description)
 
     # Pass the full description as extra details for hair, style, etc.
     return await generate_profile_photo(
@@ -258,41 +423,96 @@ def _clean_reference_image(image: Image.Image) -> Image.Image:
     return image
 
 
+def _reference_image_part(reference: Union[str, bytes]) -> types.Part:
+    """
+    Decode and clean a reference photo (base64 or raw bytes), encoding it once as a JPEG request part.
+
+    The crop needs decoded pixels, but handing the SDK a PIL image makes it
+    re-encode the crop as lossless PNG; a single JPEG encode is much cheaper
+    and several times smaller to upload.
+    """
+    image_bytes = reference if isinstance(reference, bytes) else base64.b64decode(reference)
+    source = Image.open(io.BytesIO(image_bytes))
+    source.load()
+    # Pixels are decoded; don't hold the compressed copy through the crop and re-encode
+    del image_bytes
+    # Clean reference: remove circular FB mask, convert to RGB
+    reference_image = _clean_reference_image(source)
+    del source
+    # The model downsamples large inputs anyway; don't upload the extra pixels
+    reference_image.thumbnail((REFERENCE_MAX_SIDE, REFERENCE_MAX_SIDE), Image.Resampling.LANCZOS)
+    buf = io.BytesIO()
+    reference_image.save(buf, format="JPEG", quality=95)
+    return types.Part.from_bytes(data=buf.getvalue(), mime_type="image/jpeg")
+
+
 async def generate_profile_photo_with_reference(
-    reference_image_base64: str,
+    reference_image_base64: Union[str, bytes],
     pose_prompt: str,
-    profile_name: Optional[str] = None
+    profile_name: Optional[str] = None,
+    return_base64: bool = True,
+    save_format: str = "png",
+    reuse_cached: bool = False
 ) -> Dict[str, Any]:
     """
     Generate a new photo of the same person in a different pose/setting.
     Uses simple natural language prompt with reference image.
 
     Args:
-        reference_image_base64: The current profile picture (base64 PNG/JPEG)
+        reference_image_base64: The current profile picture (base64 PNG/JPEG, or the raw
+            file bytes, which skip the base64 decode)
         pose_prompt: Simple description like "at the beach", "in a coffee shop"
         profile_name: Optional profile name for filename
+        return_base64: Include the result as base64 (skip when only the file is needed)
+        save_format: "png" (default, as returned), "webp" or "jpeg"
+        reuse_cached: Reuse an earlier result for the same reference photo and pose
+            instead of calling Gemini (off by default: each call yields a new photo)
 
     Returns:
         Dict with:
             - success: bool
             - image_path: str (path to saved image)
-            - base64_image: str (base64 encoded result for session storage)
+            - base64_image: str (base64 encoded result for session storage, if requested)
+            - cached: bool (True if served from the cache)
             - error: str (if failed)
+
+    Raises:
+        ValueError: If save_format is not supported
     """
+    _check_save_format(save_format)
     try:
-        client = get_image_client()
-
-        # Decode base64 to PIL Image
-        if reference_image_base64.startswith("data:"):
-            base64_data = reference_image_base64.split(",", 1)[1]
-        else:
-            base64_data = reference_image_base64
-
-        image_bytes = base64.b64decode(base64_data)
-        reference_image = Image.open(io.BytesIO(image_bytes))
+        # Strip any data-URL prefix; decode and clean in a worker thread
+        reference = reference_image_base64
+        if isinstance(reference, str) and reference.startswith("data:"):
+            reference = reference[reference.find(",") + 1:]
+
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename_base = profile_name or f"profile_{os.urandom(4).hex()}"
+        filename = f"{filename_base}_{timestamp}.{save_format}"
+        image_path = IMAGE_OUTPUT_DIR / filename
+        pose_summary = pose_prompt[:100] + "..." if len(pose_prompt) > 100 else pose_prompt
+
+        cache_path = None
+        if reuse_cached:
+            # Key on the reference as received; no need to decode it first
+            reference_key = reference if isinstance(reference, bytes) else reference.encode("utf-8")
+            cache_path = _cache_path(reference_key + b"\0" + pose_prompt.encode("utf-8"), save_format)
+            cached_bytes = await asyncio.to_thread(_copy_from_cache, cache_path, image_path)
+            if cached_bytes:
+                logger.info(f"[IMAGE_GEN] Reused cached reference-based photo: {image_path}")
+                result = {
+                    "success": True,
+                    "image_path": str(image_path),
+                    "filename": filename,
+                    "pose_prompt": pose_summary,
+                    "cached": True
+                }
+                if return_base64:
+                    result["base64_image"] = _b64encode_str(cached_bytes)
+                return result
 
-        # Clean reference: remove circular FB mask, convert to RGB
-        reference_image = _clean_reference_image(reference_image)
+        client = get_image_client()
+        reference_part = await asyncio.to_thread(_reference_image_part, reference)
 
         full_prompt = (
             f"casual photo of this woman {pose_prompt}, taken with her phone. "
@@ -301,58 +521,55 @@ async def generate_profile_photo_with_reference(
         )
 
         logger.info(f"[IMAGE_GEN] Generating photo for: {profile_name}")
-        logger.info(f"[IMAGE_GEN] Prompt: {full_prompt}")
+        logger.info("[IMAGE_GEN] Prompt: %s", full_prompt)
 
         # Generate image with reference
-        response = await asyncio.to_thread(
-            client.models.generate_content,
-            model=IMAGE_MODEL,
-            contents=[full_prompt, reference_image],
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-            )
+        response = await call_with_retry(
+            partial(
+                client.aio.models.generate_content,
+                model=IMAGE_MODEL,
+                contents=[full_prompt, reference_part],
+                config=types.GenerateContentConfig(
+                    response_modalities=["IMAGE"],
+                )
+            ),
+            _generation_semaphore,
+            timeout=IMAGE_GEN_TIMEOUT,
         )
 
-        # Debug: Log the raw response structure
-        logger.info(f"[IMAGE_GEN] Response received, checking structure...")
-
-        # Check if response has candidates with content
-        if hasattr(response, 'candidates') and response.candidates:
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'finish_reason'):
-                logger.info(f"[IMAGE_GEN] Finish reason: {candidate.finish_reason}")
-            if hasattr(candidate, 'safety_ratings'):
-                logger.info(f"[IMAGE_GEN] Safety ratings: {candidate.safety_ratings}")
-
-        # Check for prompt feedback (policy blocks)
-        if hasattr(response, 'prompt_feedback'):
-            logger.warning(f"[IMAGE_GEN] Prompt feedback: {response.prompt_feedback}")
+        # Extract image from response (fall back to the SDK's parts accessor)
+        candidates = getattr(response, 'candidates', None)
+        candidate = candidates[0] if candidates else None
+        try:
+            parts = candidate.content.parts
+        except AttributeError:
+            parts = getattr(response, 'parts', None)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[IMAGE_GEN] Finish reason: %s, safety ratings: %s, prompt feedback: %s",
+                getattr(candidate, 'finish_reason', None),
+                getattr(candidate, 'safety_ratings', None),
+                getattr(response, 'prompt_feedback', None),
+            )
 
-        # Extract image from response
+        # One pass: the first image, or the first text part (might be an error message)
         image_data = None
-        parts = getattr(response, 'parts', None)
-        if parts is None:
-            # Try to get parts from candidates
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'content') and candidate.content:
-                    parts = getattr(candidate.content, 'parts', [])
-
-        if parts:
-            for part in parts:
-                if hasattr(part, 'inline_data') and part.inline_data is not None:
-                    image_data = part.inline_data.data
-                    break
+        text_response = ""
+        for part in parts or ():
+            inline_data = getattr(part, 'inline_data', None)
+            if inline_data is not None:
+                image_data = inline_data.data
+                break
+            if not text_response:
+                text_response = getattr(part, 'text', None) or ""
 
         if not image_data:
-            # Check for text response (might be an error message)
-            text_response = ""
-            if parts:
-                for part in parts:
-                    if hasattr(part, 'text') and part.text:
-                        text_response = part.text
-                        break
-
+            # Surface policy blocks / finish reason, which are only logged at DEBUG otherwise
+            logger.warning(
+                f"[IMAGE_GEN] Finish reason: {getattr(candidate, 'finish_reason', None)}, "
+                f"prompt feedback: {getattr(response, 'prompt_feedback', None)}"
+            )
             error_msg = f"No image generated. Response: {text_response[:200] if text_response else 'Empty response'}"
             logger.error(f"[IMAGE_GEN] {error_msg}")
             return {
@@ -360,32 +577,26 @@ async def generate_profile_photo_with_reference(
                 "error": error_msg
             }
 
-        # Save image
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_base = profile_name or f"profile_{uuid.uuid4().hex[:8]}"
-        filename = f"{filename_base}_{timestamp}.png"
-        image_path = IMAGE_OUTPUT_DIR / filename
-
-        # Decode if needed and save
-        if isinstance(image_data, str):
-            image_bytes_out = base64.b64decode(image_data)
-            base64_result = image_data
-        else:
-            image_bytes_out = image_data
-            base64_result = base64.b64encode(image_data).decode("utf-8")
-
-        with open(image_path, "wb") as f:
-            f.write(image_bytes_out)
+        # Decode if needed and save off the event loop
+        saved_bytes = await asyncio.to_thread(_save_image, image_path, image_data, save_format)
+        if cache_path is not None:
+            await asyncio.to_thread(_store_in_cache, cache_path, saved_bytes)
 
         logger.info(f"[IMAGE_GEN] Saved reference-based photo: {image_path}")
 
-        return {
+        result = {
             "success": True,
             "image_path": str(image_path),
             "filename": filename,
-            "base64_image": base64_result,
-            "pose_prompt": pose_prompt[:100] + "..." if len(pose_prompt) > 100 else pose_prompt
+            "pose_prompt": pose_summary,
+            "cached": False
         }
+        if return_base64:
+            if save_format == "png" and isinstance(image_data, str):
+                result["base64_image"] = image_data
+            else:
+                result["base64_image"] = _b64encode_str(saved_bytes)
+        return result
 
     except Exception as e:
         logger.error(f"[IMAGE_GEN] Reference-based generation failed: {e}")
@@ -395,17 +606,14 @@ async def generate_profile_photo_with_reference(
         }
 
 
-def get_random_pose() -> Dict[str, str]:
+def get_random_pose() -> Mapping[str, str]:
     """Get a random pose from the variations pool."""
     return random.choice(POSE_VARIATIONS)
 
 
-def get_pose_by_name(name: str) -> Optional[Dict[str, str]]:
+def get_pose_by_name(name: str) -> Optional[Mapping[str, str]]:
     """Get a specific pose by name."""
-    for pose in POSE_VARIATIONS:
-        if pose["name"] == name:
-            return pose
-    return None
+    return _POSE_BY_NAME.get(name)
 
 
 # Convenience function for direct testing
@@ -1,17 +1,43 @@
 """
 Gemini Observations Store - Persistent storage for AI debugging observations.
-Stores last 75 observations to JSON file on /data volume.
+Stores last 75 observations as JSON Lines on /data volume.
 """
 import os
 import json
+import asyncio
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+# orjson encodes/parses in C (optional - falls back to stdlib json)
+try:
+    import orjson
+
+    def _loads(raw: bytes) -> Any:
+        return orjson.loads(raw)
+
+    def _encode(observation: Dict[str, Any]) -> bytes:
+        return orjson.dumps(observation, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    def _loads(raw: bytes) -> Any:
+        return json.loads(raw)
+
+    def _encode(observation: Dict[str, Any]) -> bytes:
+        return (json.dumps(observation, separators=(",", ":")) + "\n").encode("utf-8")
+
 logger = logging.getLogger("GeminiObservationsStore")
 
 MAX_OBSERVATIONS = 75  # User requested 75
 
+# Appends are O(1); the log is compacted back to the last MAX_OBSERVATIONS
+# lines once it grows past this many.
+COMPACT_AFTER_LINES = MAX_OBSERVATIONS * 2
+
+# Inside an event loop, appends are buffered and written by a worker thread
+# this long after the first one, so bursts share one write.
+FLUSH_DELAY_SECONDS = 0.25
+
 
 class GeminiObservationsStore:
     """Persistent store for Gemini AI observations."""
@@ -21,29 +47,94 @@ class GeminiObservationsStore:
             "GEMINI_OBSERVATIONS_PATH",
             os.path.join(os.path.dirname(__file__), "gemini_observations.json")
         )
+        # One observation per line; the .json path is only read to migrate old stores
+        self.log_path = os.path.splitext(self.file_path)[0] + ".jsonl"
         self.observations: List[Dict] = []
+        self._lines_on_disk = 0
+        self._pending: List[Dict] = []
+        self._io_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
         self._load()
 
     def _load(self):
-        """Load observations from disk with automatic recovery from backup."""
+        """Load observations from the JSONL log, migrating the legacy JSON file if needed."""
+        if os.path.exists(self.log_path):
+            self.observations = []
+            torn = False
+            with open(self.log_path, "rb") as f:
+                lines = f.read().splitlines()
+            for line in lines[-MAX_OBSERVATIONS:]:
+                try:
+                    self.observations.append(_loads(line))
+                except ValueError:
+                    # Torn line from a crash mid-append
+                    torn = True
+            self._lines_on_disk = len(lines)
+            logger.info(f"Loaded {len(self.observations)} Gemini observations from {self.log_path}")
+            if torn:
+                # Rewrite so the next append doesn't land on the partial line
+                self._save()
+            return
+
         from safe_io import safe_read_json
         data = safe_read_json(self.file_path)
         if data is not None:
-            self.observations = data.get("observations", [])
+            self.observations = data.get("observations", [])[-MAX_OBSERVATIONS:]
             logger.info(f"Loaded {len(self.observations)} Gemini observations from {self.file_path}")
+            self._save()
         else:
             self.observations = []
 
+    def flush(self):
+        """Write buffered observations to the log (compacting it when it has grown)."""
+        with self._io_lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            if self._lines_on_disk + len(pending) > COMPACT_AFTER_LINES:
+                self._save_locked()
+                return
+            try:
+                with open(self.log_path, "ab") as f:
+                    f.writelines(_encode(obs) for obs in pending)
+                self._lines_on_disk += len(pending)
+            except Exception as e:
+                logger.error(f"Failed to append observations: {e}")
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_soon())
+
+    async def _flush_soon(self):
+        await asyncio.sleep(FLUSH_DELAY_SECONDS)
+        await asyncio.to_thread(self.flush)
+
     def _save(self):
-        """Save observations to disk atomically."""
-        from safe_io import atomic_write_json
-        data = {
-            "updated_at": datetime.utcnow().isoformat() + "Z",
-            "count": len(self.observations),
-            "observations": self.observations
-        }
-        if not atomic_write_json(self.file_path, data):
-            logger.error(f"Failed to save observations atomically")
+        """Rewrite the log with the retained observations atomically."""
+        with self._io_lock:
+            self._pending = []
+            self._save_locked()
+
+    def _save_locked(self):
+        tmp_path = self.log_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.writelines(_encode(obs) for obs in list(self.observations))
+            os.replace(tmp_path, self.log_path)
+            self._lines_on_disk = len(self.observations)
+        except Exception as e:
+            logger.error(f"Failed to save observations atomically: {e}")
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
 
     def add_observation(
         self,
@@ -56,7 +147,7 @@ class GeminiObservationsStore:
         campaign_id: Optional[str] = None
     ):
         """
-        Add a new observation and persist.
+        Add a new observation and persist (batched off the event loop when one is running).
 
         Args:
             screenshot_name: Name of the screenshot file
@@ -78,13 +169,15 @@ class GeminiObservationsStore:
             "campaign_id": campaign_id
         }
 
-        self.observations.append(observation)
+        with self._io_lock:
+            self.observations.append(observation)
 
-        # Keep only last MAX_OBSERVATIONS
-        if len(self.observations) > MAX_OBSERVATIONS:
-            self.observations = self.observations[-MAX_OBSERVATIONS:]
+            # Keep only last MAX_OBSERVATIONS
+            if len(self.observations) > MAX_OBSERVATIONS:
+                self.observations = self.observations[-MAX_OBSERVATIONS:]
 
-        self._save()
+            self._pending.append(observation)
+        self._schedule_flush()
 
         # Also log for Railway logs
         logger.info(f"[GEMINI] {operation_type}/{prompt_type} | {profile_name} | {screenshot_name}: {full_response[:200]}...")
@@ -95,8 +188,9 @@ class GeminiObservationsStore:
 
     def clear(self) -> int:
         """Clear all observations. Returns count cleared."""
-        count = len(self.observations)
-        self.observations = []
+        with self._io_lock:
+            count = len(self.observations)
+            self.observations = []
         self._save()
         return count
 
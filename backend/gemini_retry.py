@@ -0,0 +1,63 @@
+"""
+Gemini Retry Module — Bounded, retried generate_content calls.
+
+Calls go through the SDK's native async client (client.aio). Without a
+deadline a stalled request holds its concurrency slot forever; transient
+429/5xx responses are worth a couple of spaced-out retries.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Awaitable, Callable
+
+from google.genai import errors
+
+logger = logging.getLogger("GeminiRetry")
+
+# Per-attempt deadline (seconds) and total attempts per call
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+GEMINI_MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, rate limiting and server-side failures are worth retrying."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    if isinstance(error, errors.APIError):
+        return error.code == 429 or (error.code or 0) >= 500
+    return False
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[Any]],
+    semaphore: asyncio.Semaphore,
+    timeout: float = GEMINI_TIMEOUT,
+    attempts: int = GEMINI_MAX_ATTEMPTS,
+) -> Any:
+    """
+    Await a Gemini request with a deadline, retrying transient failures.
+
+    Each attempt holds the semaphore only while it runs, so backoff sleeps don't
+    block other callers. A timed-out request is cancelled.
+
+    Args:
+        call: Zero-argument callable returning a fresh request coroutine
+        semaphore: Concurrency gate shared by the caller's module
+        timeout: Seconds allowed per attempt
+        attempts: Total attempts before the last error is raised
+    """
+    for attempt in range(max(1, attempts)):
+        try:
+            async with semaphore:
+                return await asyncio.wait_for(call(), timeout)
+        except Exception as e:
+            if attempt + 1 >= attempts or not is_retryable(e):
+                raise
+            delay = 2 ** attempt + random.random()
+            logger.warning(
+                f"Gemini call failed ({type(e).__name__}: {e}), "
+                f"retry {attempt + 1}/{attempts - 1} in {delay:.1f}s"
+            )
+        await asyncio.sleep(delay)
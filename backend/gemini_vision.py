@@ -6,12 +6,18 @@ Includes circuit breaker for automatic failover to CSS selectors during outages.
 
 import asyncio
 import base64
+import hashlib
+import json
 import logging
 import os
+import re
 import time
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union, Awaitable, Callable
 
 from google import genai
 from google.genai import types
@@ -19,6 +25,7 @@ from google.genai import types
 # Import the persistent observations store
 from gemini_observations_store import get_observations_store
 from forensics import queue_current_event
+from gemini_retry import call_with_retry
 
 logger = logging.getLogger("GeminiVision")
 
@@ -170,7 +177,26 @@ def get_observation_context() -> Dict[str, str]:
     return _current_context.copy()
 
 # Configuration from centralized config
-from config import GEMINI_API_KEY, GEMINI_MODEL, CONFIDENCE_THRESHOLD
+from config import (
+    GEMINI_API_KEY, GEMINI_MODEL, CONFIDENCE_THRESHOLD, GEMINI_CONCURRENCY,
+    VISION_MAX_OUTPUT_TOKENS, VISION_THINKING_BUDGET
+)
+
+# Shared gate on concurrent generate_content calls, so bursts queue here
+# instead of running into the API rate limit
+_gemini_semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+
+# Confident positive results kept per (prompt, screenshot content), LRU-bounded.
+# Retries often re-send an identical screenshot, which would get an identical answer.
+RESULT_CACHE_MAX = 256
+
+# verify_state answers are reused only briefly: a state check is usually
+# repeated to see whether the page has moved on, so a stale answer is riskier.
+STATE_CACHE_TTL = 2.0
+
+# Recently read screenshots, keyed by (path, size, mtime) so a rewritten file
+# is read again. Several prompts are often run against one screenshot.
+SCREENSHOT_CACHE_MAX = 32
 
 
 @dataclass
@@ -221,8 +247,8 @@ DO NOT click on:
 - The "..." more options button
 
 Return the CENTER coordinates of the Comment button (speech bubble in the MIDDLE of the reaction bar).
-Format: FOUND x=XXX y=YYY confidence=0.XX
-Or: NOT_FOUND confidence=0.XX reason=description
+Respond with found=true, x, y and confidence (0-1),
+or found=false with confidence and a short reason.
 
 IMPORTANT: x must be 150-220, y must be 420-500 for the reaction bar.""",
 
@@ -244,8 +270,8 @@ DO NOT return:
 - The post content area
 
 Return the CENTER coordinates of the text input field.
-Format: FOUND x=XXX y=YYY confidence=0.XX
-Or: NOT_FOUND confidence=0.XX reason=description
+Respond with found=true, x, y and confidence (0-1),
+or found=false with confidence and a short reason.
 
 IMPORTANT: x must be 0-393, y must be 0-873.""",
 
@@ -267,8 +293,8 @@ DO NOT return:
 - Navigation arrows
 
 Return the CENTER coordinates of the send button.
-Format: FOUND x=XXX y=YYY confidence=0.XX
-Or: NOT_FOUND confidence=0.XX reason=description
+Respond with found=true, x, y and confidence (0-1),
+or found=false with confidence and a short reason.
 
 IMPORTANT: x must be 0-393, y must be 0-873."""
 }
@@ -282,11 +308,7 @@ Check if you can see a Facebook POST (not just any page):
 2. Can you see reaction buttons below (Like, Comment, Share icons)?
 3. Is the Comment button specifically visible (speech bubble icon)?
 
-IMPORTANT: You MUST respond with ONLY one of these exact formats:
-VERIFIED confidence=0.XX
-NOT_VERIFIED reason=your reason here
-
-Do NOT write anything else. Just one line in the format above.""",
+Respond with status VERIFIED or NOT_VERIFIED, confidence (0-1) and a short reason.""",
 
     "comments_opened": """Analyze this Facebook mobile screenshot.
 
@@ -294,11 +316,7 @@ Check if the COMMENTS SECTION is now open:
 1. Can you see a "Write a comment..." input field?
 2. Is there a text input area ready for typing?
 
-IMPORTANT: You MUST respond with ONLY one of these exact formats:
-VERIFIED confidence=0.XX
-NOT_VERIFIED reason=your reason here
-
-Do NOT write anything else. Just one line in the format above.""",
+Respond with status VERIFIED or NOT_VERIFIED, confidence (0-1) and a short reason.""",
 
     "input_active": """Analyze this Facebook mobile screenshot.
 
@@ -306,11 +324,7 @@ Check if the comment input field appears ACTIVE/FOCUSED:
 1. Does the input field look selected or highlighted?
 2. Is there a cursor or text area ready for typing?
 
-IMPORTANT: You MUST respond with ONLY one of these exact formats:
-VERIFIED confidence=0.XX
-NOT_VERIFIED reason=your reason here
-
-Do NOT write anything else. Just one line in the format above.""",
+Respond with status VERIFIED or NOT_VERIFIED, confidence (0-1) and a short reason.""",
 
     "text_typed": """Analyze this Facebook mobile screenshot.
 
@@ -320,11 +334,7 @@ Check if the comment input field CONTAINS text that INCLUDES this snippet.
 This is a partial match check - the snippet may appear anywhere in the typed text (beginning, middle, or end).
 If you can see text in the input field that contains these words/characters, verify it.
 
-IMPORTANT: You MUST respond with ONLY one of these exact formats:
-VERIFIED confidence=0.XX
-NOT_VERIFIED reason=your reason here
-
-Do NOT write anything else. Just one line in the format above.""",
+Respond with status VERIFIED or NOT_VERIFIED, confidence (0-1) and a short reason.""",
 
     "comment_posted": """Analyze this Facebook mobile screenshot.
 
@@ -334,12 +344,7 @@ Check if a comment was SUCCESSFULLY POSTED that CONTAINS this snippet.
 This is a partial match check - the snippet may appear anywhere in the posted comment.
 Look in the comments section (not the input field) for text that includes these words/characters.
 
-IMPORTANT: You MUST respond with ONLY one of these exact formats:
-VERIFIED confidence=0.XX
-PENDING confidence=0.XX
-NOT_VERIFIED reason=your reason here
-
-Do NOT write anything else. Just one line in the format above.""",
+Respond with status VERIFIED, PENDING or NOT_VERIFIED, confidence (0-1) and a short reason.""",
 
     "check_restriction": """Analyze this Facebook mobile screenshot.
 
@@ -378,6 +383,114 @@ Format: STATUS=[posted|pending|failed|unknown] confidence=0.XX message=descripti
 - unknown: Cannot determine status"""
 
 
+# Bounded thinking, so a hard screenshot can't spend the whole output cap and
+# leave no answer
+_THINKING_CONFIG = types.ThinkingConfig(thinking_budget=VISION_THINKING_BUDGET)
+
+# Structured output for element lookups and state checks: the model fills
+# these schemas, so parsing is a json.loads. The text parsers still accept
+# the older "FOUND x=.. y=.." / "VERIFIED confidence=.." formats.
+_ELEMENT_CONFIG = types.GenerateContentConfig(
+    max_output_tokens=VISION_MAX_OUTPUT_TOKENS,
+    thinking_config=_THINKING_CONFIG,
+    response_mime_type="application/json",
+    response_schema=types.Schema(
+        type="OBJECT",
+        properties={
+            "found": types.Schema(type="BOOLEAN"),
+            "x": types.Schema(type="INTEGER"),
+            "y": types.Schema(type="INTEGER"),
+            "confidence": types.Schema(type="NUMBER"),
+            "reason": types.Schema(type="STRING"),
+        },
+        required=["found", "confidence"],
+    ),
+)
+_STATE_CONFIG = types.GenerateContentConfig(
+    max_output_tokens=VISION_MAX_OUTPUT_TOKENS,
+    thinking_config=_THINKING_CONFIG,
+    response_mime_type="application/json",
+    response_schema=types.Schema(
+        type="OBJECT",
+        properties={
+            "status": types.Schema(type="STRING", enum=["VERIFIED", "NOT_VERIFIED", "PENDING"]),
+            "confidence": types.Schema(type="NUMBER"),
+            "reason": types.Schema(type="STRING"),
+        },
+        required=["status", "confidence"],
+    ),
+)
+# Text-format calls (restriction, comment and decision checks) get the cap alone
+_TEXT_CONFIG = types.GenerateContentConfig(
+    max_output_tokens=VISION_MAX_OUTPUT_TOKENS,
+    thinking_config=_THINKING_CONFIG,
+)
+# check_restriction keeps its RESTRICTED/NOT_RESTRICTED text format
+_STATE_TYPES = frozenset(VERIFICATION_PROMPTS) - {"check_restriction"}
+
+# Fixed prompts as ready-made Parts, so each call doesn't wrap the same text
+# again. Prompts with extra context or {placeholders} are still sent as str.
+_ELEMENT_PARTS = {k: types.Part.from_text(text=v) for k, v in ELEMENT_PROMPTS.items()}
+_VERIFICATION_PARTS = {
+    k: types.Part.from_text(text=v) for k, v in VERIFICATION_PROMPTS.items() if "{" not in v
+}
+
+# Response field extractors: the first run of digits after each key
+_X_RE = re.compile(r"x=\D*(\d+)", re.IGNORECASE)
+_Y_RE = re.compile(r"y=\D*(\d+)", re.IGNORECASE)
+_CONFIDENCE_RE = re.compile(r"confidence=[^\d.]*([\d.]+)", re.IGNORECASE)
+_STATUS_RE = re.compile(r"status\s*=\s*(posted|pending|failed)")
+_DIGITS_RE = re.compile(r"(\d+)")
+
+
+@lru_cache(maxsize=SCREENSHOT_CACHE_MAX)
+def _read_bytes(path: str, size: int, mtime_ns: int) -> bytes:
+    return Path(path).read_bytes()
+
+
+def _read_screenshot(path: str) -> bytes:
+    """Read a screenshot, reusing the bytes if the file hasn't changed since the last read."""
+    st = os.stat(path)
+    return _read_bytes(path, st.st_size, st.st_mtime_ns)
+
+
+def _png_part(image_data: bytes) -> types.Part:
+    return types.Part.from_bytes(data=image_data, mime_type="image/png")
+
+
+def _json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Decode a structured response; None for the text formats."""
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _as_number(value: Any, kind=float):
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return kind(0)
+
+
+def _match_int(pattern: re.Pattern, text: str) -> int:
+    match = pattern.search(text)
+    return int(match.group(1)) if match else 0
+
+
+def _match_float(pattern: re.Pattern, text: str) -> float:
+    match = pattern.search(text)
+    if match:
+        try:
+            return float(match.group(1))
+        except ValueError:
+            pass
+    return 0.0
+
+
 class GeminiVisionClient:
     """Client for Gemini Vision API calls."""
 
@@ -387,8 +500,89 @@ class GeminiVisionClient:
             raise ValueError("GEMINI_API_KEY not set")
         self.client = genai.Client(api_key=self.api_key)
         self.model = GEMINI_MODEL
+        self._result_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._state_cache: "OrderedDict[tuple, Tuple[float, VerificationResult]]" = OrderedDict()
         logger.info(f"Initialized Gemini Vision with model: {self.model}")
 
+    @staticmethod
+    def _cache_key(prompt: str, image_data: bytes) -> tuple:
+        return (prompt, hashlib.blake2b(image_data, digest_size=16).digest())
+
+    def _cached_result(self, key: tuple):
+        """Get a copy of a cached parsed result, or None."""
+        cached = self._result_cache.get(key)
+        if cached is None:
+            return None
+        self._result_cache.move_to_end(key)
+        return replace(cached)
+
+    def _remember_result(self, key: tuple, result):
+        """Cache confident positive results only; a miss or a shaky answer may be transient."""
+        positive = result.found if isinstance(result, ElementLocation) else result.success
+        if not positive or result.confidence < CONFIDENCE_THRESHOLD:
+            return
+        self._result_cache[key] = replace(result)
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > RESULT_CACHE_MAX:
+            self._result_cache.popitem(last=False)
+
+    def _cached_state(self, key: tuple) -> Optional[VerificationResult]:
+        """Get a copy of a verify_state result cached within STATE_CACHE_TTL, or None."""
+        now = time.monotonic()
+        # Entries are in insertion order, so expired ones are at the front
+        while self._state_cache:
+            oldest_key, (stored_at, _) = next(iter(self._state_cache.items()))
+            if now - stored_at < STATE_CACHE_TTL:
+                break
+            del self._state_cache[oldest_key]
+        entry = self._state_cache.get(key)
+        return replace(entry[1]) if entry else None
+
+    def _remember_state(self, key: tuple, result: VerificationResult):
+        self._state_cache.pop(key, None)
+        self._state_cache[key] = (time.monotonic(), replace(result))
+
+    def clear_cache(self):
+        """Drop all cached vision results."""
+        self._result_cache.clear()
+        self._state_cache.clear()
+
+    async def _run_once(self, key: tuple, call: Callable[[], Awaitable[Any]]):
+        """
+        Await call(), coalescing concurrent calls with the same (prompt, screenshot) key.
+
+        Only the leader runs call() - the request, caching and observation
+        logging - and followers get a copy of its result. The shield keeps one
+        caller's cancellation from cancelling it for the rest.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return await asyncio.shield(task)
+        logger.debug("Joining in-flight vision call")
+        result = await asyncio.shield(task)
+        return replace(result) if result is not None else None
+
+    async def _generate(
+        self,
+        prompt: Union[str, types.Part],
+        image_part: types.Part,
+        config: Optional[types.GenerateContentConfig] = None
+    ):
+        """Run one async generate_content call behind the concurrency gate, with timeout and retries."""
+        return await call_with_retry(
+            partial(
+                self.client.aio.models.generate_content,
+                model=self.model,
+                contents=[prompt, image_part],
+                config=config or _TEXT_CONFIG
+            ),
+            _gemini_semaphore,
+        )
+
     async def find_element(
         self,
         screenshot_path: str,
@@ -416,34 +610,130 @@ class GeminiVisionClient:
             return None
 
         try:
-            # Read and encode the image
-            with open(screenshot_path, "rb") as f:
-                image_data = f.read()
+            # Read the image off the event loop
+            image_data = await asyncio.to_thread(_read_screenshot, screenshot_path)
+        except Exception as e:
+            logger.error(f"Gemini vision error: {e}")
+            _circuit_breaker.record_failure()
+            return None
+
+        return await self._find_in_image(
+            screenshot_path, image_data, _png_part(image_data), element_type, additional_context
+        )
+
+    async def find_elements_batch(
+        self,
+        screenshot_path: str,
+        element_types: List[str],
+        additional_context: str = ""
+    ) -> Dict[str, Optional[ElementLocation]]:
+        """
+        Find several elements in one screenshot with concurrent Gemini calls.
+
+        The screenshot is read once and its image part shared by every lookup.
+
+        Returns:
+            Dict mapping each element type to its ElementLocation (None on error)
+        """
+        results: Dict[str, Optional[ElementLocation]] = dict.fromkeys(element_types)
+        pending = []
+        for element_type in results:
+            if element_type in ELEMENT_PROMPTS:
+                pending.append(element_type)
+            else:
+                logger.error(f"Unknown element type: {element_type}")
+        if not pending:
+            return results
 
+        if not _circuit_breaker.can_execute():
+            logger.info(f"Circuit breaker OPEN — skipping find_elements_batch({pending}), falling back to CSS")
+            return results
+
+        try:
+            image_data = await asyncio.to_thread(_read_screenshot, screenshot_path)
+        except Exception as e:
+            logger.error(f"Gemini vision error: {e}")
+            _circuit_breaker.record_failure()
+            return results
+
+        image_part = _png_part(image_data)
+        found = await asyncio.gather(*(
+            self._find_in_image(screenshot_path, image_data, image_part, t, additional_context)
+            for t in pending
+        ))
+        results.update(zip(pending, found))
+        return results
+
+    async def find_elements(
+        self,
+        items: List[Tuple[str, str, str]]
+    ) -> List[Optional[ElementLocation]]:
+        """
+        Run several find_element lookups concurrently.
+
+        Args:
+            items: (screenshot_path, element_type, additional_context) tuples
+
+        Returns:
+            ElementLocation (or None on error) per item, in the same order
+        """
+        found = await asyncio.gather(
+            *(self.find_element(path, element_type, context) for path, element_type, context in items),
+            return_exceptions=True
+        )
+        return [None if isinstance(result, BaseException) else result for result in found]
+
+    async def _find_in_image(
+        self,
+        screenshot_path: str,
+        image_data: bytes,
+        image_part: types.Part,
+        element_type: str,
+        additional_context: str
+    ) -> Optional[ElementLocation]:
+        try:
             # Build the prompt
             prompt = ELEMENT_PROMPTS[element_type]
             if additional_context:
                 prompt += f"\n\nAdditional context: {additional_context}"
 
-            # Create the image part
-            image_part = types.Part.from_bytes(
-                data=image_data,
-                mime_type="image/png"
+            cache_key = self._cache_key(prompt, image_data)
+            cached = self._cached_result(cache_key)
+            if cached is not None:
+                logger.debug(f"Vision cache hit for {element_type}")
+                return cached
+
+            contents = prompt if additional_context else _ELEMENT_PARTS[element_type]
+            return await self._run_once(
+                cache_key,
+                partial(self._find_in_image_uncached, screenshot_path, element_type, cache_key, contents, image_part)
             )
 
+        except Exception as e:
+            logger.error(f"Gemini vision error: {e}")
+            _circuit_breaker.record_failure()
+            return None
+
+    async def _find_in_image_uncached(
+        self,
+        screenshot_path: str,
+        element_type: str,
+        cache_key: tuple,
+        contents: Union[str, types.Part],
+        image_part: types.Part
+    ) -> Optional[ElementLocation]:
+        """Uncached find_element request; runs once per in-flight (prompt, screenshot) key."""
+        try:
             # Make the API call
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=[prompt, image_part]
-            )
+            response = await self._generate(contents, image_part, _ELEMENT_CONFIG)
 
             # Parse the response
-            result_text = response.text.strip()
+            result_text = (response.text or "").strip()
             logger.debug(f"Gemini response for {element_type}: {result_text}")
 
             # Parse the response
             parsed = self._parse_element_response(result_text)
+            self._remember_result(cache_key, parsed)
 
             # Log the FULL observation before returning (for debugging)
             screenshot_name = os.path.basename(screenshot_path)
@@ -488,7 +778,8 @@ class GeminiVisionClient:
         Returns:
             VerificationResult with verified status and confidence
         """
-        if verification_type not in VERIFICATION_PROMPTS:
+        prompt = VERIFICATION_PROMPTS.get(verification_type)
+        if prompt is None:
             logger.error(f"Unknown verification type: {verification_type}")
             return VerificationResult(
                 success=False,
@@ -508,30 +799,55 @@ class GeminiVisionClient:
             )
 
         try:
-            with open(screenshot_path, "rb") as f:
-                image_data = f.read()
+            image_data = await asyncio.to_thread(_read_screenshot, screenshot_path)
 
-            # Get and format the prompt
-            prompt = VERIFICATION_PROMPTS[verification_type]
+            # Format the prompt
             if kwargs:
                 prompt = prompt.format(**kwargs)
 
-            image_part = types.Part.from_bytes(
-                data=image_data,
-                mime_type="image/png"
+            cache_key = self._cache_key(prompt, image_data)
+            cached = self._cached_state(cache_key)
+            if cached is not None:
+                logger.debug(f"Vision cache hit for verify_state ({verification_type})")
+                return cached
+
+            image_part = _png_part(image_data)
+
+            contents = prompt if kwargs else _VERIFICATION_PARTS.get(verification_type, prompt)
+            return await self._run_once(
+                cache_key,
+                partial(self._verify_state_uncached, screenshot_path, verification_type, cache_key, contents, image_part)
             )
 
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=[prompt, image_part]
+        except Exception as e:
+            logger.error(f"Gemini verify_state error: {e}")
+            _circuit_breaker.record_failure()
+            return VerificationResult(
+                success=False,
+                confidence=0.0,
+                message=str(e),
+                status="unknown"
             )
 
-            result_text = response.text.strip()
+    async def _verify_state_uncached(
+        self,
+        screenshot_path: str,
+        verification_type: str,
+        cache_key: tuple,
+        contents: Union[str, types.Part],
+        image_part: types.Part
+    ) -> VerificationResult:
+        """Uncached verify_state request; runs once per in-flight (prompt, screenshot) key."""
+        try:
+            config = _STATE_CONFIG if verification_type in _STATE_TYPES else None
+            response = await self._generate(contents, image_part, config)
+
+            result_text = (response.text or "").strip()
             logger.info(f"Gemini verify_state ({verification_type}): {result_text}")
 
             # Parse the response
             parsed = self._parse_state_verification_response(result_text)
+            self._remember_state(cache_key, parsed)
 
             # Log the FULL observation before returning (for debugging)
             screenshot_name = os.path.basename(screenshot_path)
@@ -564,6 +880,29 @@ class GeminiVisionClient:
                 status="unknown"
             )
 
+    async def verify_states(
+        self,
+        requests: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> List[VerificationResult]:
+        """
+        Run several verify_state checks concurrently.
+
+        Args:
+            requests: (screenshot_path, verification_type, kwargs) tuples
+
+        Returns:
+            VerificationResult per request, in the same order
+        """
+        verified = await asyncio.gather(
+            *(self.verify_state(path, verification_type, **kwargs) for path, verification_type, kwargs in requests),
+            return_exceptions=True
+        )
+        return [
+            VerificationResult(success=False, confidence=0.0, message=str(result), status="unknown")
+            if isinstance(result, BaseException) else result
+            for result in verified
+        ]
+
     async def check_restriction(
         self,
         screenshot_path: str
@@ -583,23 +922,13 @@ class GeminiVisionClient:
             return {"restricted": False, "reason": None, "confidence": 0.0, "circuit_breaker": True}
 
         try:
-            with open(screenshot_path, "rb") as f:
-                image_data = f.read()
+            image_data = await asyncio.to_thread(_read_screenshot, screenshot_path)
 
-            prompt = VERIFICATION_PROMPTS["check_restriction"]
-
-            image_part = types.Part.from_bytes(
-                data=image_data,
-                mime_type="image/png"
-            )
+            image_part = _png_part(image_data)
 
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=[prompt, image_part]
-            )
+            response = await self._generate(_VERIFICATION_PARTS["check_restriction"], image_part)
 
-            result_text = response.text.strip()
+            result_text = (response.text or "").strip()
             logger.info(f"Gemini check_restriction: {result_text}")
 
             # Parse the response
@@ -680,27 +1009,50 @@ class GeminiVisionClient:
             )
 
         try:
-            with open(screenshot_path, "rb") as f:
-                image_data = f.read()
+            image_data = await asyncio.to_thread(_read_screenshot, screenshot_path)
 
             prompt = VERIFICATION_PROMPT.format(comment=expected_comment[:100])
 
-            image_part = types.Part.from_bytes(
-                data=image_data,
-                mime_type="image/png"
+            cache_key = self._cache_key(prompt, image_data)
+            cached = self._cached_result(cache_key)
+            if cached is not None:
+                logger.debug("Vision cache hit for comment verification")
+                return cached
+
+            image_part = _png_part(image_data)
+
+            return await self._run_once(
+                cache_key,
+                partial(self._verify_comment_uncached, screenshot_path, cache_key, prompt, image_part)
             )
 
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=[prompt, image_part]
+        except Exception as e:
+            logger.error(f"Gemini verification error: {e}")
+            _circuit_breaker.record_failure()
+            return VerificationResult(
+                success=False,
+                confidence=0.0,
+                message=str(e),
+                status="unknown"
             )
 
-            result_text = response.text.strip()
+    async def _verify_comment_uncached(
+        self,
+        screenshot_path: str,
+        cache_key: tuple,
+        prompt: str,
+        image_part: types.Part
+    ) -> VerificationResult:
+        """Uncached verify_comment_posted request; runs once per in-flight (prompt, screenshot) key."""
+        try:
+            response = await self._generate(prompt, image_part)
+
+            result_text = (response.text or "").strip()
             logger.info(f"Gemini verification response: {result_text}")
 
             # Parse the response
             parsed = self._parse_verification_response(result_text)
+            self._remember_result(cache_key, parsed)
 
             # Log the FULL observation before returning (for debugging)
             screenshot_name = os.path.basename(screenshot_path)
@@ -751,16 +1103,13 @@ class GeminiVisionClient:
         - SCROLL: Element off-screen
         - RETRY: Just try again
         """
-        import json
-
         # Circuit breaker check
         if not _circuit_breaker.can_execute():
             logger.info("Circuit breaker OPEN — skipping decide_next_action, defaulting to RETRY")
             return {"action": "RETRY", "circuit_breaker": True}
 
         try:
-            with open(screenshot_path, "rb") as f:
-                image_data = f.read()
+            image_data = await asyncio.to_thread(_read_screenshot, screenshot_path)
 
             prompt = f"""Analyze this Facebook mobile screenshot. I tried to click "{action_attempted}" but the CSS selectors failed.
 
@@ -784,18 +1133,11 @@ WAIT seconds=2
 TRY_SELECTOR selector=div[role="button"]:has-text("Comment")
 SCROLL direction=down"""
 
-            image_part = types.Part.from_bytes(
-                data=image_data,
-                mime_type="image/png"
-            )
+            image_part = _png_part(image_data)
 
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=[prompt, image_part]
-            )
+            response = await self._generate(prompt, image_part)
 
-            result_text = response.text.strip()
+            result_text = (response.text or "").strip()
             logger.info(f"Gemini decision: {result_text}")
 
             # Parse the decision
@@ -824,72 +1166,72 @@ SCROLL direction=down"""
 
     def _parse_decision(self, response: str) -> dict:
         """Parse Gemini's decision into actionable dict."""
-        import re
-
         # Get first line only (ignore extra explanation)
         first_line = response.strip().split('\n')[0].strip()
+        head = first_line.upper()
 
-        if first_line.upper().startswith("ABORT"):
+        if head.startswith("ABORT"):
             reason = first_line.split("=", 1)[1].strip() if "=" in first_line else "unknown"
             return {"action": "ABORT", "reason": reason}
 
-        elif first_line.upper().startswith("WAIT"):
-            match = re.search(r'(\d+)', first_line)
+        elif head.startswith("WAIT"):
+            match = _DIGITS_RE.search(first_line)
             seconds = int(match.group(1)) if match else 2
             return {"action": "WAIT", "seconds": min(seconds, 5)}
 
-        elif first_line.upper().startswith("CLOSE_POPUP"):
+        elif head.startswith("CLOSE_POPUP"):
             selector = first_line.split("=", 1)[1].strip() if "=" in first_line else 'button[aria-label="Close"]'
             return {"action": "CLOSE_POPUP", "selector": selector}
 
-        elif first_line.upper().startswith("TRY_SELECTOR"):
+        elif head.startswith("TRY_SELECTOR"):
             selector = first_line.split("=", 1)[1].strip() if "=" in first_line else None
             return {"action": "TRY_SELECTOR", "selector": selector}
 
-        elif first_line.upper().startswith("SCROLL"):
-            direction = "down" if "down" in first_line.lower() else "up"
+        elif head.startswith("SCROLL"):
+            direction = "down" if "DOWN" in head else "up"
             return {"action": "SCROLL", "direction": direction}
 
         else:
             return {"action": "RETRY"}
 
     def _parse_element_response(self, response: str) -> ElementLocation:
-        """Parse Gemini response for element location."""
-        response_upper = response.upper()
-
+        """Parse Gemini response for element location (JSON, or the FOUND/NOT_FOUND text format)."""
         # Viewport bounds (mobile viewport)
         MAX_X = 393
         MAX_Y = 873
         MARGIN = 10  # Pixels from edge
 
-        if "FOUND" in response_upper and "NOT_FOUND" not in response_upper:
-            try:
-                # Extract coordinates
-                x = self._extract_number(response, "x=")
-                y = self._extract_number(response, "y=")
-                confidence = self._extract_float(response, "confidence=")
-
-                if x > 0 and y > 0:
-                    # VALIDATE & CLIP BOUNDS
-                    original_x, original_y = x, y
-                    x = min(max(x, MARGIN), MAX_X - MARGIN)
-                    y = min(max(y, MARGIN), MAX_Y - MARGIN)
-
-                    if original_x != x or original_y != y:
-                        logger.warning(f"Vision coords clipped: ({original_x},{original_y}) → ({x},{y})")
-
-                    return ElementLocation(
-                        found=True,
-                        x=x,
-                        y=y,
-                        confidence=confidence,
-                        description=response
-                    )
-            except Exception as e:
-                logger.warning(f"Failed to parse coordinates: {e}")
-
-        # Not found or parse error
-        confidence = self._extract_float(response, "confidence=")
+        data = _json_object(response)
+        if data is not None:
+            found = bool(data.get("found"))
+            x = _as_number(data.get("x"), int)
+            y = _as_number(data.get("y"), int)
+            confidence = _as_number(data.get("confidence"))
+        else:
+            response_upper = response.upper()
+            found = "FOUND" in response_upper and "NOT_FOUND" not in response_upper
+            x = _match_int(_X_RE, response)
+            y = _match_int(_Y_RE, response)
+            confidence = _match_float(_CONFIDENCE_RE, response)
+
+        if found and x > 0 and y > 0:
+            # VALIDATE & CLIP BOUNDS
+            original_x, original_y = x, y
+            x = min(max(x, MARGIN), MAX_X - MARGIN)
+            y = min(max(y, MARGIN), MAX_Y - MARGIN)
+
+            if original_x != x or original_y != y:
+                logger.warning(f"Vision coords clipped: ({original_x},{original_y}) → ({x},{y})")
+
+            return ElementLocation(
+                found=True,
+                x=x,
+                y=y,
+                confidence=confidence,
+                description=response
+            )
+
+        # Not found or no usable coordinates
         return ElementLocation(
             found=False,
             confidence=confidence,
@@ -898,26 +1240,41 @@ SCROLL direction=down"""
 
     def _parse_state_verification_response(self, response: str) -> VerificationResult:
         """Parse Gemini response for state verification (VERIFIED/NOT_VERIFIED/PENDING)."""
-        response_upper = response.upper()
+        data = _json_object(response)
+        if data is not None:
+            status = {
+                "VERIFIED": "verified",
+                "NOT_VERIFIED": "not_verified",
+                "PENDING": "pending",
+            }.get(str(data.get("status", "")).upper(), "unknown")
+            return VerificationResult(
+                # PENDING is never success; callers wait and re-verify
+                success=status == "verified",
+                confidence=_as_number(data.get("confidence")),
+                message=data.get("reason") or response,
+                status=status
+            )
+
+        # One lowered copy serves both the keyword checks and the reason= offset
         response_lower = response.lower()
 
         # Determine if verified
         verified = False
         status = "unknown"
 
-        if "VERIFIED" in response_upper and "NOT_VERIFIED" not in response_upper:
+        if "verified" in response_lower and "not_verified" not in response_lower:
             verified = True
             status = "verified"
-        elif "NOT_VERIFIED" in response_upper:
+        elif "not_verified" in response_lower:
             verified = False
             status = "not_verified"
-        elif "PENDING" in response_upper:
+        elif "pending" in response_lower:
             # PENDING means the comment text IS visible but shows "Posting..." status
             # This almost always means the comment WILL post - Facebook is just slow
             status = "pending"
             # We'll determine verified based on confidence below
 
-        confidence = self._extract_float(response, "confidence=")
+        confidence = _match_float(_CONFIDENCE_RE, response)
 
         # PENDING always means "comment is still being posted" - NEVER treat as success
         # The retry logic in comment_bot.py will wait and re-verify
@@ -945,15 +1302,10 @@ SCROLL direction=down"""
         response_lower = response.lower()
 
         # Extract status
-        status = "unknown"
-        if "status=posted" in response_lower or "status = posted" in response_lower:
-            status = "posted"
-        elif "status=pending" in response_lower or "status = pending" in response_lower:
-            status = "pending"
-        elif "status=failed" in response_lower or "status = failed" in response_lower:
-            status = "failed"
+        status_match = _STATUS_RE.search(response_lower)
+        status = status_match.group(1) if status_match else "unknown"
 
-        confidence = self._extract_float(response, "confidence=")
+        confidence = _match_float(_CONFIDENCE_RE, response)
 
         # Extract message
         message = response
@@ -971,43 +1323,6 @@ SCROLL direction=down"""
             status=status
         )
 
-    def _extract_number(self, text: str, prefix: str) -> int:
-        """Extract an integer after a prefix."""
-        text_lower = text.lower()
-        prefix_lower = prefix.lower()
-
-        if prefix_lower in text_lower:
-            start = text_lower.index(prefix_lower) + len(prefix_lower)
-            num_str = ""
-            for char in text[start:]:
-                if char.isdigit():
-                    num_str += char
-                elif num_str:
-                    break
-            if num_str:
-                return int(num_str)
-        return 0
-
-    def _extract_float(self, text: str, prefix: str) -> float:
-        """Extract a float after a prefix."""
-        text_lower = text.lower()
-        prefix_lower = prefix.lower()
-
-        if prefix_lower in text_lower:
-            start = text_lower.index(prefix_lower) + len(prefix_lower)
-            num_str = ""
-            for char in text[start:]:
-                if char.isdigit() or char == '.':
-                    num_str += char
-                elif num_str:
-                    break
-            if num_str:
-                try:
-                    return float(num_str)
-                except ValueError:
-                    pass
-        return 0.0
-
 
 # Singleton instance
 _vision_client: Optional[GeminiVisionClient] = None
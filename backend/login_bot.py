@@ -6,7 +6,6 @@ Uses the same audit trail pattern as comment_bot.py
 import asyncio
 import logging
 import os
-import random
 import time
 import uuid
 from contextlib import asynccontextmanager
@@ -15,10 +14,10 @@ from typing import Dict, List, Optional, Any
 from playwright.async_api import async_playwright, Page, BrowserContext
 from playwright_stealth import Stealth
 
-from fb_session import FacebookSession, apply_session_to_context
+from fb_session import FacebookSession, apply_session_to_context, random_usa_timezone, timezone_for_user_id
 from fb_selectors import LOGIN, TWO_FA, PAGE_STATE, SIGNUP_PROMPT
 from credentials import CredentialManager
-from config import MOBILE_VIEWPORT, DEFAULT_USER_AGENT, USA_TIMEZONES, DEBUG_DIR
+from config import MOBILE_VIEWPORT, DEFAULT_USER_AGENT, DEBUG_DIR
 
 # Setup logging
 logger = logging.getLogger("LoginBot")
@@ -1498,7 +1497,7 @@ async def login_facebook(
     # Generate device fingerprint for this new session
     # Use random USA timezone since we don't have user_id yet
     login_device_fingerprint = {
-        "timezone": random.choice(USA_TIMEZONES),
+        "timezone": random_usa_timezone(),
         "locale": "en-US"
     }
     logger.info(f"[{trace_id}] Login with fingerprint: timezone={login_device_fingerprint['timezone']}")
@@ -2049,10 +2048,8 @@ async def fetch_profile_data_from_cookies(
             if not active_proxy:
                 raise Exception("No proxy available — cannot launch browser without proxy")
 
-            # Generate deterministic timezone from user_id (same as fb_session.get_device_fingerprint)
-            import hashlib
-            timezone_index = int(hashlib.md5(user_id.encode()).hexdigest(), 16) % len(USA_TIMEZONES)
-            timezone_id = USA_TIMEZONES[timezone_index]
+            # Deterministic timezone from user_id (shared with FacebookSession.get_device_fingerprint)
+            timezone_id = timezone_for_user_id(user_id)
 
             # Build context options (matching comment_bot.py gold standard)
             context_options = {
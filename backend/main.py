@@ -10438,6 +10438,10 @@ async def shutdown_event():
         logger.info("Reddit mission scheduler stopped on shutdown")
     await reddit_program_scheduler.stop()
     logger.info("Reddit program scheduler stopped on shutdown")
+    from gemini_observations_store import get_observations_store
+    get_observations_store().flush()
+    from url_utils import close_shared_client
+    await close_shared_client()
 
 
 # =========================================================================
@@ -280,6 +280,7 @@ async def generate_post_bundle(
             reference_image_base64=reference_image,
             pose_prompt=pose_prompt,
             profile_name=profile_name.replace(" ", "_").lower(),
+            return_base64=False,
         )
     else:
         hints = character_profile.get("ambient_prompt_hints") or [
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import fb_selectors
+
+
+def test_selector_union_splits_playwright_text_selectors_from_css():
+    css_union, text_selectors = fb_selectors.get_selector_union("login", "login_button")
+
+    assert css_union == 'button[name="login"], button[type="submit"]'
+    assert text_selectors == (
+        'button:has-text("Log in")',
+        'button:has-text("Log In")',
+        'div[role="button"]:has-text("Log in")',
+    )
+
+
+def test_selector_union_is_cached_and_tolerates_unknown_keys():
+    first = fb_selectors.get_selector_union("feed", "feed_container")
+
+    assert fb_selectors.get_selector_union("feed", "feed_container") is first
+    assert fb_selectors.get_selector_union("feed", "missing") == ("", ())
+
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import fb_session
+from config import USA_TIMEZONES
+from fb_session import FacebookSession, timezone_for_user_id
+
+
+def test_timezone_for_user_id_keeps_legacy_md5_assignment():
+    user_id = "61571383800545"
+    legacy_index = int(hashlib.md5(user_id.encode()).hexdigest(), 16) % len(USA_TIMEZONES)
+
+    assert timezone_for_user_id(user_id) == USA_TIMEZONES[legacy_index]
+
+
+def test_device_fingerprint_is_derived_from_c_user_cookie():
+    session = FacebookSession("tz probe")
+    session.data = {"cookies": [{"name": "c_user", "value": "100001"}, {"name": "xs", "value": "x"}]}
+
+    assert session.get_device_fingerprint() == {
+        "timezone": timezone_for_user_id("100001"),
+        "locale": "en-US",
+    }
+
+
+def test_cookie_index_follows_reassigned_session_data():
+    session = FacebookSession("index probe")
+    session.data = {"cookies": [{"name": "c_user", "value": "1"}]}
+    assert session.get_user_id() == "1"
+    assert session.has_valid_cookies() is False
+
+    session.data = {"cookies": [{"name": "c_user", "value": "2"}, {"name": "xs", "value": "x"}]}
+    assert session.get_user_id() == "2"
+    assert session.has_valid_cookies() is True
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_duplicate_cookie_names_resolve_to_the_first_occurrence(tmp_path, monkeypatch, use_msgspec):
+    if use_msgspec and fb_session._summary_decoder is None:
+        pytest.skip("msgspec not installed")
+    if not use_msgspec:
+        monkeypatch.setattr(fb_session, "_summary_decoder", None)
+    monkeypatch.setattr(fb_session, "SESSIONS_DIR", tmp_path)
+    monkeypatch.setattr(fb_session, "_LIST_CACHE", None)
+    session = FacebookSession("Dup User")
+    session.session_file = tmp_path / "dup_user.json"
+    session.data = {
+        "profile_name": "Dup User",
+        "cookies": [
+            {"name": "c_user", "value": "first"},
+            {"name": "xs", "value": "x"},
+            {"name": "c_user", "value": "second"},
+        ],
+    }
+
+    assert session.get_user_id() == "first"
+    (tmp_path / "dup_user.json").write_text(json.dumps(session.data))
+    assert fb_session.list_saved_sessions()[0]["user_id"] == "first"
+    assert fb_session._index_cookies(session.data["cookies"])["c_user"]["value"] == "first"
+
+
+def test_list_saved_sessions_reports_user_id_and_cookie_validity(tmp_path, monkeypatch):
+    monkeypatch.setattr(fb_session, "SESSIONS_DIR", tmp_path)
+    valid = FacebookSession("Valid User")
+    valid.data = {
+        "profile_name": "Valid User",
+        "cookies": [{"name": "c_user", "value": "42"}, {"name": "xs", "value": "x"}],
+    }
+    valid.session_file = tmp_path / "valid_user.json"
+    assert valid.save() is True
+    (tmp_path / "broken.json").write_text("{not json")
+
+    sessions = fb_session.list_saved_sessions()
+
+    assert [s["file"] for s in sessions] == ["valid_user.json"]
+    assert sessions[0]["user_id"] == "42"
+    assert sessions[0]["has_valid_cookies"] is True
+
+
+def test_list_saved_sessions_cache_refreshes_after_save(tmp_path, monkeypatch):
+    monkeypatch.setattr(fb_session, "SESSIONS_DIR", tmp_path)
+    monkeypatch.setattr(fb_session, "_LIST_CACHE", None)
+    session = FacebookSession("Cached User")
+    session.session_file = tmp_path / "cached_user.json"
+    session.data = {"profile_name": "Cached User", "cookies": [], "tags": ["a"]}
+    assert session.save() is True
+
+    first = fb_session.list_saved_sessions()
+    first[0]["display_name"] = "mutated by caller"
+    first[0]["tags"].append("mutated")
+    assert fb_session.list_saved_sessions()[0]["display_name"] == "Cached User"
+    assert fb_session.list_saved_sessions()[0]["tags"] == ["a"]
+
+    session.data["tags"] = ["b"]
+    assert session.save() is True
+    assert fb_session.list_saved_sessions()[0]["tags"] == ["b"]
+
+
+def test_save_persists_cookie_summary_and_listing_handles_legacy_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(fb_session, "SESSIONS_DIR", tmp_path)
+    monkeypatch.setattr(fb_session, "_LIST_CACHE", None)
+    session = FacebookSession("New Format")
+    session.session_file = tmp_path / "new_format.json"
+    session.data = {"profile_name": "New Format", "cookies": [{"name": "c_user", "value": "7"}]}
+    assert session.save() is True
+    (tmp_path / "old_format.json").write_text(
+        json.dumps({
+            "profile_name": "Old Format",
+            "cookies": [{"name": "c_user", "value": "8"}, {"name": "xs", "value": "x"}],
+        })
+    )
+
+    saved = json.loads(session.session_file.read_text())
+    assert saved["_user_id"] == "7"
+    assert saved["_has_valid_cookies"] is False
+
+    by_file = {s["file"]: s for s in fb_session.list_saved_sessions()}
+    assert (by_file["new_format.json"]["user_id"], by_file["new_format.json"]["has_valid_cookies"]) == ("7", False)
+    assert (by_file["old_format.json"]["user_id"], by_file["old_format.json"]["has_valid_cookies"]) == ("8", True)
+
+
+class _FakeLocator:
+    async def count(self):
+        return 0
+
+
+class _FakeContext:
+    def __init__(self, cookies):
+        self._cookies = cookies
+        self.cookie_calls = 0
+
+    async def cookies(self):
+        self.cookie_calls += 1
+        return self._cookies
+
+
+class _FakePage:
+    def __init__(self, cookies, final_url="https://m.facebook.com/profile.php?id=1"):
+        self.context = _FakeContext(cookies)
+        self.url = "about:blank"
+        self._final_url = final_url
+
+    async def goto(self, url, **kwargs):
+        self.url = self._final_url
+
+    async def wait_for_url(self, predicate, timeout=None):
+        assert predicate(self.url)
+
+    def locator(self, selector):
+        return _FakeLocator()
+
+
+def test_verify_session_logged_in_skips_context_cookies_when_session_known():
+    page = _FakePage(cookies=[])
+    session = FacebookSession("verify probe")
+    session.data = {"cookies": [{"name": "c_user", "value": "1"}, {"name": "xs", "value": "x"}]}
+
+    assert asyncio.run(fb_session.verify_session_logged_in(page, session=session, debug=False)) is True
+    assert page.context.cookie_calls == 0
+
+
+def test_verify_session_logged_in_falls_back_to_context_cookies():
+    page = _FakePage(cookies=[{"name": "xs", "value": "x"}])
+
+    assert asyncio.run(fb_session.verify_session_logged_in(page, debug=False)) is False
+    assert page.context.cookie_calls == 1
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_session_listing_matches_with_and_without_msgspec(tmp_path, monkeypatch, use_msgspec):
+    if use_msgspec and fb_session._summary_decoder is None:
+        pytest.skip("msgspec not installed")
+    if not use_msgspec:
+        monkeypatch.setattr(fb_session, "_summary_decoder", None)
+    monkeypatch.setattr(fb_session, "SESSIONS_DIR", tmp_path)
+    monkeypatch.setattr(fb_session, "_LIST_CACHE", None)
+    (tmp_path / "legacy.json").write_text(
+        json.dumps({
+            "profile_name": "legacy",
+            "display_name": "Legacy User",
+            "cookies": [{"name": "c_user", "value": "9", "domain": ".facebook.com"}, {"name": "xs", "value": "x"}],
+            "tags": ["warm"],
+            "device": {"timezone": "America/Chicago"},
+        })
+    )
+
+    assert fb_session.list_saved_sessions() == [{
+        "file": "legacy.json",
+        "profile_name": "legacy",
+        "display_name": "Legacy User",
+        "user_id": "9",
+        "extracted_at": None,
+        "proxy": None,
+        "has_valid_cookies": True,
+        "profile_picture": None,
+        "tags": ["warm"],
+    }]
+
+
+def test_extract_from_page_reads_user_agent_once_per_context():
+    class _Page(_FakePage):
+        viewport_size = {"width": 393, "height": 873}
+
+        def __init__(self, context):
+            self.context = context
+            self.evaluate_calls = 0
+
+        async def evaluate(self, expression):
+            self.evaluate_calls += 1
+            return "UA/1.0"
+
+    context = _FakeContext([{"name": "c_user", "value": "1"}, {"name": "xs", "value": "x"}])
+    first, second = _Page(context), _Page(context)
+
+    data = asyncio.run(FacebookSession("ua probe").extract_from_page(first))
+    asyncio.run(FacebookSession("ua probe").extract_from_page(second))
+
+    assert data["user_agent"] == "UA/1.0"
+    assert first.evaluate_calls + second.evaluate_calls == 1
+
+
+def test_random_usa_timezone_only_returns_configured_zones():
+    assert len(fb_session.USA_TIMEZONE_WEIGHTS) == len(USA_TIMEZONES)
+    assert {fb_session.random_usa_timezone() for _ in range(200)} <= set(USA_TIMEZONES)
+
+
+def test_me_redirect_predicate_waits_only_while_still_on_me():
+    assert fb_session._me_redirect_resolved("https://m.facebook.com/me/") is False
+    assert fb_session._me_redirect_resolved("https://m.facebook.com/melissa.jones") is True
+    assert fb_session._me_redirect_resolved("https://m.facebook.com/login/?next=%2Fme%2F") is True
+    assert fb_session._me_redirect_resolved("https://m.facebook.com/checkpoint/828281030927956/") is True
@@ -0,0 +1,179 @@
+import asyncio
+import base64
+import io
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import gemini_image_gen
+from gemini_image_gen import (
+    POSE_VARIATIONS,
+    _reference_image_part,
+    _save_image,
+    build_selfie_prompt,
+    get_pose_by_name,
+    parse_persona_description,
+)
+
+
+def test_parse_persona_description_detects_all_attributes():
+    assert parse_persona_description("friendly middle-aged white woman with brown hair") == (
+        "woman", "40-50", "caucasian"
+    )
+    assert parse_persona_description("Young Korean guy, loves hiking") == ("man", "25-32", "asian")
+    assert parse_persona_description("senior hispanic male") == ("man", "55-65", "latina")
+
+
+def test_parse_persona_description_matches_whole_words_only():
+    # "caucasian" contains "asian", "the" contains "he": neither should leak
+    assert parse_persona_description("caucasian, the outdoorsy type") == ("woman", "30-40", "caucasian")
+    assert parse_persona_description("middle aged indian man")[1:] == ("40-50", "south asian")
+
+
+def test_parse_persona_description_accepts_plural_and_inflected_forms():
+    assert parse_persona_description("fun guys who like cars") == ("man", "30-40", "caucasian")
+    assert parse_persona_description("younger females") == ("woman", "25-32", "caucasian")
+    assert parse_persona_description("elderly men, latinos") == ("man", "55-65", "latina")
+    assert parse_persona_description("group of ladies in their sixties") == ("woman", "55-65", "caucasian")
+
+
+def test_parse_persona_description_defaults():
+    assert parse_persona_description("") == ("woman", "30-40", "caucasian")
+
+
+def test_build_selfie_prompt_fills_head_and_appends_details():
+    prompt = build_selfie_prompt("man", "40-50", "asian", "short grey hair")
+    assert prompt.startswith("Generate a hyper-realistic iPhone selfie photo of a asian man in their 40-50s.\n\n")
+    assert "ANTI-AI TELLS TO AVOID:" in prompt
+    assert prompt.endswith("nothing else.\n\nshort grey hair")
+
+
+def test_get_pose_by_name():
+    assert get_pose_by_name("beach") is POSE_VARIATIONS[0]
+    assert get_pose_by_name("nowhere") is None
+
+
+def test_pose_variations_are_read_only():
+    with pytest.raises(TypeError):
+        get_pose_by_name("beach")["prompt"] = "somewhere else"
+
+
+def test_reference_image_part_is_cropped_jpeg():
+    buf = io.BytesIO()
+    Image.new("RGBA", (200, 200), (10, 20, 30, 255)).save(buf, format="PNG")
+
+    part = _reference_image_part(base64.b64encode(buf.getvalue()).decode("ascii"))
+
+    assert part.inline_data.mime_type == "image/jpeg"
+    cleaned = Image.open(io.BytesIO(part.inline_data.data))
+    assert cleaned.format == "JPEG"
+    assert cleaned.mode == "RGB"
+    assert cleaned.size == (140, 140)
+
+
+def test_reference_image_part_downscales_large_photos():
+    buf = io.BytesIO()
+    Image.new("RGB", (3000, 2000), (10, 20, 30)).save(buf, format="JPEG")
+
+    part = _reference_image_part(base64.b64encode(buf.getvalue()).decode("ascii"))
+
+    cleaned = Image.open(io.BytesIO(part.inline_data.data))
+    assert max(cleaned.size) == 1024
+
+
+def test_reference_image_part_accepts_raw_bytes():
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 200), (10, 20, 30)).save(buf, format="PNG")
+
+    raw = _reference_image_part(buf.getvalue())
+    encoded = _reference_image_part(base64.b64encode(buf.getvalue()).decode("ascii"))
+
+    assert raw.inline_data.data == encoded.inline_data.data
+
+
+def test_save_image_decodes_base64_payloads(tmp_path):
+    _save_image(tmp_path / "raw.png", b"\x89PNG raw")
+    _save_image(tmp_path / "b64.png", base64.b64encode(b"\x89PNG b64").decode("ascii"))
+
+    assert (tmp_path / "raw.png").read_bytes() == b"\x89PNG raw"
+    assert (tmp_path / "b64.png").read_bytes() == b"\x89PNG b64"
+
+
+def test_generate_profile_photos_batch_bounds_concurrency(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(**spec):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"success": True, "profile_name": spec["profile_name"]}
+
+    monkeypatch.setattr(gemini_image_gen, "generate_profile_photo", fake_generate)
+    specs = [{"profile_name": f"p{i}"} for i in range(6)]
+
+    results = asyncio.run(gemini_image_gen.generate_profile_photos_batch(specs, max_concurrency=2))
+
+    assert [r["profile_name"] for r in results] == [f"p{i}" for i in range(6)]
+    assert peak == 2
+
+
+def test_save_image_reencodes_opt_in_formats(tmp_path):
+    buf = io.BytesIO()
+    Image.new("RGBA", (32, 32), (200, 100, 50, 255)).save(buf, format="PNG")
+
+    written = _save_image(tmp_path / "photo.jpeg", buf.getvalue(), "jpeg")
+
+    assert (tmp_path / "photo.jpeg").read_bytes() == written
+    assert Image.open(tmp_path / "photo.jpeg").format == "JPEG"
+
+
+def test_reference_generation_reuses_cached_photo(tmp_path, monkeypatch):
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 64), (10, 20, 30)).save(buf, format="PNG")
+    reference = base64.b64encode(buf.getvalue()).decode("ascii")
+    calls = []
+
+    class FakeModels:
+        async def generate_content(self, **kwargs):
+            calls.append(kwargs)
+            part = SimpleNamespace(inline_data=SimpleNamespace(data=b"\x89PNG generated"), text=None)
+            return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+    monkeypatch.setattr(gemini_image_gen, "IMAGE_OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(gemini_image_gen, "get_image_client", lambda: SimpleNamespace(aio=SimpleNamespace(models=FakeModels())))
+
+    async def run():
+        return [
+            await gemini_image_gen.generate_profile_photo_with_reference(
+                reference, "at the beach", profile_name=f"p{i}", reuse_cached=True
+            )
+            for i in range(2)
+        ]
+
+    first, second = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert first["image_path"] != second["image_path"]
+    assert Path(second["image_path"]).read_bytes() == b"\x89PNG generated"
+    assert second["base64_image"] == first["base64_image"]
+
+
+def test_unsupported_save_format_is_rejected_before_generation(monkeypatch):
+    def no_client():
+        raise AssertionError("generation should not start")
+
+    monkeypatch.setattr(gemini_image_gen, "get_image_client", no_client)
+
+    with pytest.raises(ValueError, match="png, webp, jpeg"):
+        asyncio.run(gemini_image_gen.generate_profile_photo(save_format="gif"))
+    with pytest.raises(ValueError):
+        asyncio.run(gemini_image_gen.generate_profile_photo_with_reference("aGk=", "beach", save_format="tiff"))
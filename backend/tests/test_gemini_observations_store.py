@@ -0,0 +1,77 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import gemini_observations_store
+from gemini_observations_store import GeminiObservationsStore, MAX_OBSERVATIONS
+
+
+def _add(store, i):
+    store.add_observation(
+        screenshot_name=f"shot_{i}.png",
+        operation_type="find_element",
+        prompt_type="comment_button",
+        full_response=f"FOUND x={i} y=1 confidence=0.9",
+        parsed_result={"found": True},
+    )
+
+
+def test_observations_are_appended_and_reloaded(tmp_path):
+    store = GeminiObservationsStore(str(tmp_path / "obs.json"))
+    for i in range(3):
+        _add(store, i)
+
+    lines = (tmp_path / "obs.jsonl").read_text().splitlines()
+    assert [json.loads(line)["screenshot_name"] for line in lines] == ["shot_0.png", "shot_1.png", "shot_2.png"]
+
+    reloaded = GeminiObservationsStore(str(tmp_path / "obs.json"))
+    assert [o["screenshot_name"] for o in reloaded.get_recent(2)] == ["shot_2.png", "shot_1.png"]
+
+
+def test_log_is_compacted_to_retained_observations(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_observations_store, "COMPACT_AFTER_LINES", MAX_OBSERVATIONS + 5)
+    store = GeminiObservationsStore(str(tmp_path / "obs.json"))
+    for i in range(MAX_OBSERVATIONS + 6):
+        _add(store, i)
+
+    lines = (tmp_path / "obs.jsonl").read_text().splitlines()
+    assert len(lines) == MAX_OBSERVATIONS
+    assert json.loads(lines[-1])["screenshot_name"] == f"shot_{MAX_OBSERVATIONS + 5}.png"
+
+
+def test_legacy_json_store_is_migrated(tmp_path):
+    legacy = tmp_path / "obs.json"
+    legacy.write_text(json.dumps({"observations": [{"screenshot_name": "old.png"}]}))
+
+    store = GeminiObservationsStore(str(legacy))
+
+    assert store.get_recent() == [{"screenshot_name": "old.png"}]
+    assert (tmp_path / "obs.jsonl").read_text() == '{"screenshot_name":"old.png"}\n'
+
+
+def test_torn_trailing_line_is_skipped(tmp_path):
+    (tmp_path / "obs.jsonl").write_text('{"screenshot_name":"ok.png"}\n{"screenshot_na')
+
+    store = GeminiObservationsStore(str(tmp_path / "obs.json"))
+
+    assert store.get_recent() == [{"screenshot_name": "ok.png"}]
+    assert (tmp_path / "obs.jsonl").read_text() == '{"screenshot_name":"ok.png"}\n'
+
+
+def test_appends_inside_event_loop_are_batched_off_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_observations_store, "FLUSH_DELAY_SECONDS", 0)
+    store = GeminiObservationsStore(str(tmp_path / "obs.json"))
+    log = tmp_path / "obs.jsonl"
+
+    async def run():
+        for i in range(3):
+            _add(store, i)
+        assert not log.exists()  # nothing written on the loop thread
+        await store._flush_task
+
+    asyncio.run(run())
+
+    assert len(log.read_text().splitlines()) == 3
@@ -0,0 +1,62 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from google.genai import errors
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import gemini_retry
+from gemini_retry import call_with_retry, is_retryable
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(gemini_retry.asyncio, "sleep", lambda _delay: real_sleep(0))
+
+
+def test_is_retryable_only_for_transient_failures():
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(errors.ServerError(503, {}))
+    assert is_retryable(errors.ClientError(429, {}))
+    assert not is_retryable(errors.ClientError(400, {}))
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_call_with_retry_retries_transient_errors():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise errors.ServerError(503, {})
+        return "ok"
+
+    assert asyncio.run(call_with_retry(flaky, asyncio.Semaphore(1), attempts=3)) == "ok"
+    assert len(calls) == 3
+
+
+def test_call_with_retry_raises_non_retryable_immediately():
+    calls = []
+
+    async def bad_request():
+        calls.append(1)
+        raise errors.ClientError(400, {})
+
+    with pytest.raises(errors.ClientError):
+        asyncio.run(call_with_retry(bad_request, asyncio.Semaphore(1), attempts=3))
+    assert len(calls) == 1
+
+
+def test_call_with_retry_times_out_each_attempt():
+    calls = []
+
+    async def stalled():
+        calls.append(1)
+        await asyncio.Event().wait()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(call_with_retry(stalled, asyncio.Semaphore(1), timeout=0.01, attempts=2))
+    assert len(calls) == 2
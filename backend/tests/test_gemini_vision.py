@@ -0,0 +1,238 @@
+import asyncio
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import gemini_vision
+from gemini_vision import GeminiVisionClient
+
+
+class _FakeModels:
+    def __init__(self, text="FOUND x=180 y=460 confidence=0.91", delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_content(self, model, contents, **kwargs):
+        self.calls.append(contents)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return SimpleNamespace(text=self.text)
+
+
+def _client(models):
+    client = GeminiVisionClient.__new__(GeminiVisionClient)
+    client.api_key = "test"
+    client.model = "test-model"
+    client.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    client._result_cache = OrderedDict()
+    client._inflight = {}
+    client._state_cache = OrderedDict()
+    return client
+
+
+def test_generate_is_bounded_by_the_concurrency_gate(monkeypatch):
+    models = _FakeModels(delay=0.02)
+    client = _client(models)
+
+    async def run():
+        monkeypatch.setattr(gemini_vision, "_gemini_semaphore", asyncio.Semaphore(2))
+        await asyncio.gather(*(client._generate("prompt", None) for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert len(models.calls) == 6
+    assert models.peak == 2
+
+
+def test_find_element_reads_screenshot_and_parses_location(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    screenshot = tmp_path / "shot.png"
+    screenshot.write_bytes(b"\x89PNG fake")
+    models = _FakeModels()
+
+    location = asyncio.run(_client(models).find_element(str(screenshot), "comment_button"))
+
+    assert (location.found, location.x, location.y, location.confidence) == (True, 180, 460, 0.91)
+    assert models.calls[0][1].inline_data.data == b"\x89PNG fake"
+    assert models.calls[0][0] is gemini_vision._ELEMENT_PARTS["comment_button"]
+
+
+def test_find_element_reuses_result_for_identical_screenshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    first = tmp_path / "first.png"
+    second = tmp_path / "second.png"
+    first.write_bytes(b"same pixels")
+    second.write_bytes(b"same pixels")
+    models = _FakeModels()
+    client = _client(models)
+
+    a = asyncio.run(client.find_element(str(first), "comment_button"))
+    b = asyncio.run(client.find_element(str(second), "comment_button"))
+    asyncio.run(client.find_element(str(second), "send_button"))
+
+    assert a == b and a is not b
+    assert len(models.calls) == 2
+
+    client.clear_cache()
+    asyncio.run(client.find_element(str(first), "comment_button"))
+    assert len(models.calls) == 3
+
+
+def test_parse_element_response_extracts_and_clips_coordinates():
+    client = _client(_FakeModels())
+
+    found = client._parse_element_response("FOUND x=185 y=9999 confidence=0.87")
+    missing = client._parse_element_response("NOT_FOUND confidence=.4 reason=no bubble")
+
+    assert (found.found, found.x, found.y, found.confidence) == (True, 185, 863, 0.87)
+    assert (missing.found, missing.confidence) == (False, 0.4)
+
+
+def test_parse_structured_responses():
+    client = _client(_FakeModels())
+
+    found = client._parse_element_response('{"found": true, "x": 500, "y": 460, "confidence": 0.9}')
+    missing = client._parse_element_response('{"found": false, "confidence": 0.3, "reason": "no bubble"}')
+    pending = client._parse_state_verification_response('{"status": "PENDING", "confidence": 0.7, "reason": "Posting..."}')
+    verified = client._parse_state_verification_response('{"status": "VERIFIED", "confidence": 0.95}')
+
+    assert (found.found, found.x, found.y, found.confidence) == (True, 383, 460, 0.9)
+    assert (missing.found, missing.confidence) == (False, 0.3)
+    assert (pending.success, pending.status, pending.message) == (False, "pending", "Posting...")
+    assert (verified.success, verified.status, verified.confidence) == (True, "verified", 0.95)
+
+
+def test_parse_verification_response_reads_status_and_message():
+    client = _client(_FakeModels())
+
+    result = client._parse_verification_response("STATUS = posted confidence=0.93 message=Comment visible")
+    unknown = client._parse_verification_response("no idea, confidence=0.9.")
+
+    assert (result.success, result.status, result.confidence) == (True, "posted", 0.93)
+    assert result.message == "Comment visible"
+    assert (unknown.status, unknown.confidence) == ("unknown", 0.0)
+
+
+def test_find_elements_batch_shares_one_image_part(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    screenshot = tmp_path / "shot.png"
+    screenshot.write_bytes(b"\x89PNG batch")
+    models = _FakeModels()
+
+    results = asyncio.run(_client(models).find_elements_batch(
+        str(screenshot), ["comment_button", "send_button", "bogus", "comment_button"]
+    ))
+
+    assert list(results) == ["comment_button", "send_button", "bogus"]
+    assert results["bogus"] is None
+    assert results["comment_button"].found and results["send_button"].found
+    assert len(models.calls) == 2
+    assert models.calls[0][1] is models.calls[1][1]
+
+
+def test_verify_states_runs_requests_concurrently_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    shots = []
+    for i in range(3):
+        shot = tmp_path / f"shot_{i}.png"
+        shot.write_bytes(f"pixels {i}".encode())
+        shots.append(str(shot))
+    models = _FakeModels(text="VERIFIED confidence=0.8", delay=0.02)
+
+    async def run():
+        monkeypatch.setattr(gemini_vision, "_gemini_semaphore", asyncio.Semaphore(3))
+        return await _client(models).verify_states([
+            (shots[0], "post_visible", {}),
+            (shots[1], "comments_opened", {}),
+            (shots[2], "no_such_check", {}),
+        ])
+
+    results = asyncio.run(run())
+
+    assert [r.status for r in results] == ["verified", "verified", "unknown"]
+    assert models.peak == 2
+
+
+def test_read_screenshot_reuses_bytes_until_the_file_changes(tmp_path):
+    shot = tmp_path / "shot.png"
+    shot.write_bytes(b"first")
+
+    first = gemini_vision._read_screenshot(str(shot))
+    assert gemini_vision._read_screenshot(str(shot)) is first
+
+    shot.write_bytes(b"second frame")
+    assert gemini_vision._read_screenshot(str(shot)) == b"second frame"
+
+
+def test_concurrent_identical_lookups_share_one_call(tmp_path, monkeypatch):
+    observations = []
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: observations.append(kwargs))
+    shot = tmp_path / "shot.png"
+    shot.write_bytes(b"pixels")
+    models = _FakeModels(text="VERIFIED confidence=0.9", delay=0.02)
+    client = _client(models)
+
+    async def run():
+        return await asyncio.gather(*(client.verify_state(str(shot), "post_visible") for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert len(models.calls) == 1
+    assert len(observations) == 1
+    assert [r.status for r in results] == ["verified"] * 3
+    assert len({id(r) for r in results}) == 3
+    assert client._inflight == {}
+
+
+def test_verify_state_reuses_result_only_within_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    shot = tmp_path / "shot.png"
+    shot.write_bytes(b"pixels")
+    models = _FakeModels(text="NOT_VERIFIED reason=still loading")
+    client = _client(models)
+
+    first = asyncio.run(client.verify_state(str(shot), "comments_opened"))
+    second = asyncio.run(client.verify_state(str(shot), "comments_opened"))
+    for key, (stored_at, result) in client._state_cache.items():
+        client._state_cache[key] = (stored_at - gemini_vision.STATE_CACHE_TTL, result)
+    asyncio.run(client.verify_state(str(shot), "comments_opened"))
+
+    assert first == second
+    assert len(models.calls) == 2
+
+
+def test_empty_response_is_not_found_rather_than_a_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    breaker = gemini_vision.CircuitBreaker()
+    monkeypatch.setattr(gemini_vision, "_circuit_breaker", breaker)
+    shot = tmp_path / "shot.png"
+    shot.write_bytes(b"pixels")
+    client = _client(_FakeModels(text=None))
+
+    location = asyncio.run(client.find_element(str(shot), "send_button"))
+    state = asyncio.run(client.verify_state(str(shot), "post_visible"))
+
+    assert location.found is False
+    assert (state.success, state.status) == (False, "unknown")
+    assert breaker.failure_count == 0
+
+
+def test_misses_and_low_confidence_results_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini_vision, "log_gemini_observation", lambda **kwargs: None)
+    shot = tmp_path / "shot.png"
+    shot.write_bytes(b"pixels")
+
+    for text in ("NOT_FOUND confidence=0.9 reason=hidden", "FOUND x=100 y=200 confidence=0.3"):
+        models = _FakeModels(text=text)
+        client = _client(models)
+        asyncio.run(client.find_element(str(shot), "comment_button"))
+        asyncio.run(client.find_element(str(shot), "comment_button"))
+        assert len(models.calls) == 2
@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import url_utils
+from url_utils import resolve_facebook_redirect
+
+
+def _resolve(url, handler):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await resolve_facebook_redirect(url, client=client)
+
+    return asyncio.run(run())
+
+
+def test_redirects_are_followed_on_caller_clients_and_successes_cached(monkeypatch):
+    monkeypatch.setattr(url_utils, "_resolved_cache", url_utils.OrderedDict())
+
+    def handler(request):
+        if request.url.path == "/share/p/abc":
+            return httpx.Response(302, headers={"Location": "https://www.facebook.com/somepage/posts/pfbid0xyz"})
+        return httpx.Response(200, text="<html></html>")
+
+    resolved = _resolve("https://www.facebook.com/share/p/abc", handler)
+
+    assert resolved == "https://www.facebook.com/somepage/posts/pfbid0xyz"
+    assert url_utils._resolved_cache["https://www.facebook.com/share/p/abc"] == resolved
+
+
+def test_failed_and_login_wall_lookups_are_not_cached(monkeypatch):
+    monkeypatch.setattr(url_utils, "_resolved_cache", url_utils.OrderedDict())
+
+    _resolve("https://www.facebook.com/share/p/limited", lambda request: httpx.Response(429))
+
+    def login_wall(request):
+        if request.url.path.startswith("/login"):
+            return httpx.Response(200, text="<html>log in</html>")
+        return httpx.Response(302, headers={"Location": "https://www.facebook.com/login/?next=x"})
+
+    _resolve("https://www.facebook.com/share/p/walled", login_wall)
+
+    assert not url_utils._resolved_cache
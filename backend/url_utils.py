@@ -1,15 +1,80 @@
+import asyncio
 import re
 import logging
 import httpx
+from collections import OrderedDict
+from typing import Optional
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 logger = logging.getLogger("URLUtils")
 
-async def resolve_facebook_redirect(url: str, timeout: int = 10) -> str:
+# Desktop user agent gives a better chance of finding numeric IDs in the page
+_REDIRECT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Successful redirect resolutions, LRU-bounded. The same post is often
+# commented on from many profiles, and each lookup is a full page fetch.
+_RESOLVED_CACHE_MAX = 512
+_resolved_cache: "OrderedDict[str, str]" = OrderedDict()
+
+# Keep-alive client shared by redirect lookups, so repeated resolutions reuse
+# pooled TLS connections. httpx clients are bound to the loop that created them.
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_shared_client() -> httpx.AsyncClient:
+    """Get the pooled AsyncClient for the running event loop, creating it if needed."""
+    global _shared_client, _shared_client_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client.is_closed or _shared_client_loop is not loop:
+        _shared_client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+        _shared_client_loop = loop
+    return _shared_client
+
+
+async def close_shared_client():
+    """Close the pooled client (called from the app shutdown handler)."""
+    global _shared_client, _shared_client_loop
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+    _shared_client = None
+    _shared_client_loop = None
+
+
+# Redirect targets that mean Facebook refused the lookup, not a resolved post
+_BLOCKED_PATH_MARKERS = ("/login", "/checkpoint")
+
+
+def _is_cacheable(resp: httpx.Response, final_url: str) -> bool:
+    """Only successful lookups are cached; rate limits, errors and login walls are retried next time."""
+    if not resp.is_success:
+        return False
+    path = urlparse(final_url).path
+    return not any(marker in path for marker in _BLOCKED_PATH_MARKERS)
+
+
+def _remember_resolution(url: str, resolved: str):
+    _resolved_cache[url] = resolved
+    _resolved_cache.move_to_end(url)
+    while len(_resolved_cache) > _RESOLVED_CACHE_MAX:
+        _resolved_cache.popitem(last=False)
+
+
+async def resolve_facebook_redirect(
+    url: str, timeout: int = 10, client: Optional[httpx.AsyncClient] = None
+) -> str:
     """
     Follow redirects and scrape numeric IDs from Facebook page content.
     Converts pfbid format to numeric post IDs when possible.
-    Uses async httpx to avoid blocking the event loop.
+    Uses async httpx to avoid blocking the event loop; pass `client` to reuse
+    a caller-owned connection pool instead of the shared one.
     """
     if not url:
         return url
@@ -18,21 +83,21 @@ async def resolve_facebook_redirect(url: str, timeout: int = 10) -> str:
     if 'posts/' in url and 'pfbid' not in url:
         return url
 
-    try:
-        # Use desktop user agent for better chance of finding numeric IDs
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-        }
+    cached = _resolved_cache.get(url)
+    if cached is not None:
+        _resolved_cache.move_to_end(url)
+        return cached
 
+    try:
         # Ensure url has scheme
         fetch_url = url if '://' in url else f"https://{url}"
 
-        async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as client:
-            resp = await client.get(fetch_url, headers=headers)
-            final_url = str(resp.url)
-            content = resp.text
+        http = client if client is not None else _get_shared_client()
+        # Per request, so a caller-supplied client follows redirects too
+        resp = await http.get(fetch_url, headers=_REDIRECT_HEADERS, timeout=timeout, follow_redirects=True)
+        final_url = str(resp.url)
+        content = resp.text
+        cacheable = _is_cacheable(resp, final_url)
 
         # Try to find Numeric Post ID from page content
         post_id = None
@@ -67,8 +132,12 @@ async def resolve_facebook_redirect(url: str, timeout: int = 10) -> str:
         if post_id and page_id:
             short_url = f"fb.com/{page_id}/posts/{post_id}"
             logger.info(f"Resolved to numeric URL: {short_url} ({len(short_url)} chars)")
+            if cacheable:
+                _remember_resolution(url, short_url)
             return short_url
 
+        if cacheable:
+            _remember_resolution(url, final_url)
         return final_url
 
     except Exception as e:
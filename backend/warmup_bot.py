@@ -12,22 +12,26 @@ Warm-up actions:
 import asyncio
 import logging
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 
 from playwright.async_api import Page, Browser, BrowserContext
 
-from fb_selectors import FEED
+from fb_selectors import FEED, get_selector_union
 
 logger = logging.getLogger("WarmupBot")
 
+# Per-action ceilings so one stuck action can't consume the whole warm-up
+SCROLL_TIMEOUT_SECONDS = 5.0
+LIKE_TIMEOUT_SECONDS = 10.0
+
 
 def _brief(e: Exception) -> str:
     """Truncate Playwright errors to first line (full call logs can be 60+ lines)."""
     return str(e).split("\n")[0]
 
 
-@dataclass
+@dataclass(slots=True)
 class WarmupResult:
     """Result of warm-up activity."""
     success: bool
@@ -36,11 +40,16 @@ class WarmupResult:
     profiles_visited: int = 0
     duration_seconds: float = 0.0
     error: Optional[str] = None
-    actions: List[str] = None
+    actions: List[str] = field(default_factory=list)
+
 
-    def __post_init__(self):
-        if self.actions is None:
-            self.actions = []
+async def _bounded(coro, timeout: float, label: str) -> bool:
+    """Await a warm-up action with a ceiling; a timeout counts as a failed action."""
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up action '{label}' timed out after {timeout:.0f}s, moving on")
+        return False
 
 
 async def human_delay(min_seconds: float = 1.0, max_seconds: float = 3.0):
@@ -77,29 +86,28 @@ async def scroll_feed(page: Page, direction: str = "down", amount: int = 300) ->
         return False
 
 
-async def find_like_buttons(page: Page, max_count: int = 10) -> List[Any]:
+async def pick_random_like_button(page: Page) -> Optional[Any]:
     """
-    Find visible like buttons on the current page.
+    Pick one visible like button at random without materializing every match.
+
+    Probes matches of each selector in random order and stops at the first
+    visible one, so only a handful of elements cross the CDP boundary.
 
     Returns:
-        List of like button element handles
+        Locator for the chosen button, or None
     """
-    like_buttons = []
-
     for selector in FEED["like_button"]:
         try:
-            elements = await page.query_selector_all(selector)
-            for el in elements:
-                # Check if element is visible
-                is_visible = await el.is_visible()
-                if is_visible:
-                    like_buttons.append(el)
-                    if len(like_buttons) >= max_count:
-                        return like_buttons
+            matches = page.locator(selector)
+            count = await matches.count()
+            for index in random.sample(range(count), count):
+                candidate = matches.nth(index)
+                if await candidate.is_visible():
+                    return candidate
         except Exception as e:
-            logger.debug(f"Error finding like buttons with {selector}: {e}")
+            logger.debug(f"Error picking like button with {selector}: {e}")
 
-    return like_buttons
+    return None
 
 
 async def like_random_post(page: Page) -> bool:
@@ -110,15 +118,12 @@ async def like_random_post(page: Page) -> bool:
         True if like was successful
     """
     try:
-        like_buttons = await find_like_buttons(page, max_count=20)
+        button = await pick_random_like_button(page)
 
-        if not like_buttons:
+        if button is None:
             logger.warning("No like buttons found on page")
             return False
 
-        # Pick a random like button
-        button = random.choice(like_buttons)
-
         # Click the like button
         await button.click()
         logger.info("Clicked like button on a post")
@@ -142,26 +147,23 @@ async def navigate_to_feed(page: Page) -> bool:
     try:
         current_url = page.url
 
-        # If already on feed, just scroll to refresh
+        # If already on feed, skip the reload; the warm-up scrolls refresh it
         if "facebook.com" in current_url and ("/home" in current_url or current_url.endswith("facebook.com/")):
-            logger.info("Already on feed, refreshing...")
-            await page.reload()
-            await page.wait_for_load_state("networkidle", timeout=15000)
+            logger.info("Already on feed, skipping navigation")
             return True
 
         # Navigate to home feed
         await page.goto("https://m.facebook.com/", timeout=30000)
         await page.wait_for_load_state("networkidle", timeout=15000)
 
-        # Wait for feed to appear
+        # Wait for feed to appear (any container variant, one selector query)
+        feed_union, _ = get_selector_union("feed", "feed_container")
         feed_found = False
-        for selector in FEED["feed_container"]:
-            try:
-                await page.wait_for_selector(selector, timeout=5000)
-                feed_found = True
-                break
-            except Exception:
-                continue
+        try:
+            await page.wait_for_selector(feed_union, timeout=5000)
+            feed_found = True
+        except Exception:
+            pass
 
         if not feed_found:
             logger.warning("Feed container not found after navigation")
@@ -196,8 +198,9 @@ async def perform_warmup(
     Returns:
         WarmupResult with stats about what was done
     """
-    import time
-    start_time = time.time()
+    # Monotonic loop clock, fetched once for the whole warm-up
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
 
     result = WarmupResult(
         success=False,
@@ -227,7 +230,9 @@ async def perform_warmup(
 
         for i in range(scroll_target):
             # Scroll down
-            scroll_success = await scroll_feed(page, "down", random.randint(200, 500))
+            scroll_success = await _bounded(
+                scroll_feed(page, "down", random.randint(200, 500)), SCROLL_TIMEOUT_SECONDS, "scroll"
+            )
             if scroll_success:
                 scrolls_done += 1
                 result.actions.append(f"scroll_{i+1}")
@@ -239,7 +244,7 @@ async def perform_warmup(
             if likes_done < like_target:
                 like_probability = 0.7 if likes_done < like_target // 2 else 0.4
                 if random.random() < like_probability:
-                    like_success = await like_random_post(page)
+                    like_success = await _bounded(like_random_post(page), LIKE_TIMEOUT_SECONDS, "like")
                     if like_success:
                         likes_done += 1
                         result.actions.append(f"liked_post_{likes_done}")
@@ -251,15 +256,14 @@ async def perform_warmup(
         logger.info("Warm-up: Final scroll session...")
         final_scroll_count = random.randint(2, 4)
         for _ in range(final_scroll_count):
-            await scroll_feed(page, "down", random.randint(300, 600))
+            await _bounded(scroll_feed(page, "down", random.randint(300, 600)), SCROLL_TIMEOUT_SECONDS, "final scroll")
             await human_delay(2.0, 4.0)
             scrolls_done += 1
 
         result.actions.append("final_scroll_session")
 
         # Calculate duration
-        end_time = time.time()
-        result.duration_seconds = end_time - start_time
+        result.duration_seconds = loop.time() - start_time
         result.scroll_count = scrolls_done
         result.likes_count = likes_done
         result.success = True
@@ -270,7 +274,7 @@ async def perform_warmup(
     except Exception as e:
         logger.error(f"Warm-up failed: {_brief(e)}")
         result.error = str(e)
-        result.duration_seconds = time.time() - start_time
+        result.duration_seconds = loop.time() - start_time
         return result
 
 